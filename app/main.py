@@ -1,11 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers.api.v1 import items, matching
+from app.routers.api.v1 import admin, items, matching, talent_pool
 from app.routers import user_router
+from app.services.admission import AdmissionMiddleware, admission_controller
+from app.services.metrics import metrics
+from app.services.profiling import ProfilingMiddleware
 
 # Create FastAPI app
 app = FastAPI()
 
+# Shed excess matching load before request bodies are read (inside CORS, so
+# rejections still carry CORS headers)
+app.add_middleware(AdmissionMiddleware)
+
+# Opt-in request profiling (admin header or sampling); wraps admission control
+app.add_middleware(ProfilingMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -22,7 +32,21 @@ def health_check():
     return {"status": "healthy", "message": "Service is running"}
 
 
+# Admission control counters and in-flight budgets
+@app.get("/admission")
+def get_admission_stats():
+    return admission_controller.stats()
+
+
+# Service metrics (AI parse outcomes, etc.)
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
+
+
 # Register API routes
 app.include_router(items.router)
 app.include_router(user_router, prefix="/api/v1")
 app.include_router(matching.router, prefix="/api/v1")
+app.include_router(talent_pool.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
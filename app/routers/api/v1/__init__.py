@@ -1,3 +1,5 @@
 from .user import router as user_router
 from .items import router as items_router
 from .matching import router as matching_router
+from .talent_pool import router as talent_pool_router
+from .admin import router as admin_router
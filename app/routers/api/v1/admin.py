@@ -0,0 +1,46 @@
+"""Admin API routes for downloading request profiles."""
+
+import json
+import os
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app.services.profiling import is_admin_token, list_profiles, profile_path
+
+
+def require_admin_token(x_admin_token: str = Header("")):
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_token)]
+)
+
+
+@router.get("/profiles")
+def get_profiles():
+    """List stored request profiles, newest first."""
+    return {"success": True, "data": list_profiles()}
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """Return a profile's summary: spans, wait times and top functions."""
+    path = profile_path(profile_id, "json")
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    with open(path, "r") as f:
+        return {"success": True, "data": json.load(f)}
+
+
+@router.get("/profiles/{profile_id}/download")
+def download_profile(profile_id: str):
+    """Download the raw cProfile stats, loadable with pstats or snakeviz."""
+    path = profile_path(profile_id, "prof")
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(
+        path, media_type="application/octet-stream", filename=f"{profile_id}.prof"
+    )
@@ -1,14 +1,53 @@
 import json
 import os
-from fastapi import APIRouter, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+import re
+import shutil
+import tempfile
+import zipfile
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, Form, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 import PyPDF2
 import docx
 import requests
+from pydantic import ValidationError
+from app.schemas.matching import (
+    RESPONSE_KEYS,
+    RESPONSE_MODELS,
+    gemini_multi_response_schema,
+    gemini_response_schema,
+)
+from app.services.admission import refine_admission
+from app.services.json_response import dumps, encode_json_response
+from app.services.metrics import metrics
+from app.services.model_router import model_router
+from app.services.near_duplicate import (
+    FINGERPRINT_BITS,
+    jd_key,
+    near_duplicate_index,
+    simhash,
+)
+from app.services.profiling import profile_span
 
 router = APIRouter(prefix="/matching", tags=["matching"])
 
 
+def read_pdf(file):
+    """
+    Extract the text and page count of a PDF file.
+
+    Returns:
+        tuple: ``(text, pages)``
+    """
+    with profile_span("pdf_extract"):
+        reader = PyPDF2.PdfReader(file)
+        text = ""
+        for page in reader.pages:
+            text += page.extract_text() or ""
+    return text, len(reader.pages)
+
+
 def extract_text_from_pdf(file):
     """
     Extract text from a PDF file.
@@ -19,23 +58,125 @@ def extract_text_from_pdf(file):
     Returns:
         str: The extracted text content from all pages of the PDF
     """
-    reader = PyPDF2.PdfReader(file)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text
+    return read_pdf(file)[0]
 
 
 def extract_text_from_docx(file):
     """Extract text from a DOCX file."""
-    doc = docx.Document(file)
-    return "\n".join([para.text for para in doc.paragraphs])
+    with profile_span("docx_extract"):
+        doc = docx.Document(file)
+        return "\n".join([para.text for para in doc.paragraphs])
+
+
+class UnsupportedFileTypeError(ValueError):
+    """Raised when a resume file is neither a PDF nor a DOCX."""
+
+
+def extract_resume(filename: str, file):
+    """
+    Extract a resume's text and page count, dispatching on its extension.
+
+    DOCX files have no fixed pagination, so their page count is None.
+
+    Returns:
+        tuple: ``(text, pages)``
+
+    Raises:
+        UnsupportedFileTypeError: If the file is neither a PDF nor a DOCX
+    """
+    filename = (filename or "").lower()
+    if filename.endswith(".pdf"):
+        return read_pdf(file)
+    if filename.endswith(".docx"):
+        return extract_text_from_docx(file), None
+    raise UnsupportedFileTypeError(
+        "Unsupported file type. Please upload a PDF or DOCX file."
+    )
+
+
+def extract_text_from_file(filename: str, file) -> str:
+    """
+    Extract text from a resume file, dispatching on its extension.
+
+    Raises:
+        UnsupportedFileTypeError: If the file is neither a PDF nor a DOCX
+    """
+    return extract_resume(filename, file)[0]
+
+
+GEMINI_API_URL = (
+    "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+)
+
+
+def request_gemini(
+    prompt: str, generation_config: dict = None, model: str = "gemini-1.5-flash-latest"
+) -> dict:
+    """
+    Send a prompt to a Gemini model and return the decoded response payload.
+
+    Raises:
+        requests.exceptions.RequestException: On network or HTTP errors
+    """
+    api_key = os.getenv("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY")
+    url = f"{GEMINI_API_URL.format(model=model)}?key={api_key}"
+
+    headers = {"Content-Type": "application/json"}
+    data = {"contents": [{"parts": [{"text": prompt}]}]}
+    if generation_config:
+        data["generationConfig"] = generation_config
+
+    with profile_span(f"gemini_request:{model}"):
+        response = requests.post(url, headers=headers, json=data, timeout=60)
+        response.raise_for_status()
+    print("Gemini raw response:", response.text)
+
+    with profile_span("gemini_response_decode"):
+        return response.json()
+
+
+def gemini_response_text(payload: dict) -> str:
+    """
+    Return the text of the first candidate in a Gemini response payload.
+
+    Raises:
+        KeyError: If the API response does not have the expected shape
+    """
+    return payload["candidates"][0]["content"]["parts"][0]["text"]
+
+
+def gemini_output_truncated(payload: dict) -> bool:
+    """Whether Gemini stopped because it hit the output token limit."""
+    candidates = payload.get("candidates") or [{}]
+    if candidates[0].get("finishReason") != "MAX_TOKENS":
+        return False
+    metrics.increment("gemini_json.truncated")
+    return True
+
+
+def analysis_confidence(result: dict, user_type: str) -> float:
+    """Fraction of expected scores present in a validated result (0 if unusable)."""
+    if result.get("overall_score") is None:
+        return 0.0
+    score_keys = [
+        key
+        for key, description in RESPONSE_KEYS[user_type]
+        if description.startswith("number")
+    ]
+    return sum(1 for key in score_keys if result.get(key) is not None) / len(score_keys)
+
 
+def get_gemini_score_and_suggestions(
+    jd: str, resume: str, user_type: str, depth: str = "full"
+) -> dict:
+    """
+    Call Gemini API to score and suggest improvements based on user type.
 
-def get_gemini_score_and_suggestions(jd: str, resume: str, user_type: str) -> dict:
-    """Call Gemini API to score and suggest improvements based on user type."""
+    The model tier is picked by ``model_router`` from the user type, resume
+    length and ``depth`` ("quick" or "full"); a low-confidence or incomplete
+    result is re-run once on the next tier up.
+    """
     api_key = os.getenv("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY")
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}"
 
     # Input validation
     if not jd or not resume:
@@ -51,27 +192,46 @@ def get_gemini_score_and_suggestions(jd: str, resume: str, user_type: str) -> di
         return {"score": None, "suggestions": "API key not configured"}
 
     # Generate user-specific prompt
-    prompt = generate_user_specific_prompt(jd, resume, user_type)
+    with profile_span("prompt_build"):
+        prompt = generate_user_specific_prompt(jd, resume, user_type)
 
-    headers = {"Content-Type": "application/json"}
-    data = {"contents": [{"parts": [{"text": prompt}]}]}
+    generation_config = {
+        "responseMimeType": "application/json",
+        "responseSchema": gemini_response_schema(user_type),
+    }
+    tier = model_router.choose_tier(user_type, estimate_tokens(resume), depth)
+    escalations = 0
 
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=60)
-        response.raise_for_status()
-        print("Gemini raw response:", response.text)
-
-        ai_text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
-        ai_text_clean = clean_json_response(ai_text)
-
-        try:
-            result = json.loads(ai_text_clean)
-            return validate_response(result, user_type)
-        except json.JSONDecodeError as e:
-            return {
-                "score": None,
-                "suggestions": f"AI response not valid JSON: {ai_text_clean} \n Error: {e}",
-            }
+        while True:
+            payload = model_router.call(
+                tier, lambda model: request_gemini(prompt, generation_config, model)
+            )
+            ai_text = gemini_response_text(payload)
+
+            if gemini_output_truncated(payload):
+                # A repaired prefix can still pass validation; never accept it
+                # as a complete analysis
+                result = {
+                    "score": None,
+                    "suggestions": "Incomplete response. Output was cut off at the token limit.",
+                }
+            else:
+                try:
+                    with profile_span("json_parse_validate"):
+                        result = validate_response(parse_ai_json(ai_text), user_type)
+                except json.JSONDecodeError as e:
+                    result = {
+                        "score": None,
+                        "suggestions": f"AI response not valid JSON: {clean_json_response(ai_text)} \n Error: {e}",
+                    }
+
+            next_tier = model_router.escalation_tier(
+                tier, analysis_confidence(result, user_type), escalations
+            )
+            if next_tier is None:
+                return result
+            tier, escalations = next_tier, escalations + 1
     except requests.exceptions.Timeout:
         return {"score": None, "suggestions": "Request timed out. Please try again."}
     except requests.exceptions.RequestException as e:
@@ -85,20 +245,13 @@ def get_gemini_score_and_suggestions(jd: str, resume: str, user_type: str) -> di
         return {"score": None, "suggestions": f"AI call failed: {e}"}
 
 
-def generate_user_specific_prompt(jd: str, resume: str, user_type: str) -> str:
-    """Generate tailored prompts based on user type."""
-
-    if user_type == "HR":
-        return f"""
-You are an expert HR consultant and recruitment specialist. Analyze the following job description and candidate's resume to provide a comprehensive evaluation for hiring decision-making.
-
-Job Description:
-{jd}
-
-Candidate's Resume:
-{resume}
-
-**ANALYSIS REQUIRED:**
+# Prompt building blocks per user type, shared by single and multi-job-description
+# prompts. The response keys themselves live in app.schemas.matching.
+PROMPT_TEMPLATES = {
+    "HR": {
+        "role": "You are an expert HR consultant and recruitment specialist. Analyze the following job description and candidate's resume to provide a comprehensive evaluation for hiring decision-making.",
+        "resume_label": "Candidate's Resume:",
+        "instructions": """**ANALYSIS REQUIRED:**
 
 1. **OVERALL COMPATIBILITY SCORE (0-100)**: Provide a numerical score with detailed justification.
 
@@ -123,34 +276,13 @@ Candidate's Resume:
 
 5. **COMPARATIVE ANALYSIS**:
    - How does this candidate compare to typical market standards for this role?
-   - What percentage of job requirements does this candidate meet?
-
-Respond in JSON format with keys: 
-- "overall_score" (number 0-100)
-- "technical_skills_score" (number 0-100)
-- "experience_score" (number 0-100)
-- "education_score" (number 0-100)
-- "cultural_fit_score" (number 0-100)
-- "domain_expertise_score" (number 0-100)
-- "critical_gaps" (string)
-- "red_flags" (string)
-- "hiring_recommendation" (string)
-- "interview_focus_areas" (string)
-- "detailed_analysis" (string)
-- "risk_assessment" (string)
-"""
-
-    else:  # candidate
-        return f"""
-You are an expert career coach and resume optimization specialist. Analyze the following job description and the candidate's resume to provide actionable improvement recommendations.
-
-Job Description:
-{jd}
-
-Your Resume:
-{resume}
-
-**COMPREHENSIVE RESUME OPTIMIZATION ANALYSIS:**
+   - What percentage of job requirements does this candidate meet?""",
+        "keys_header": "Respond in JSON format with keys: ",
+    },
+    "candidate": {
+        "role": "You are an expert career coach and resume optimization specialist. Analyze the following job description and the candidate's resume to provide actionable improvement recommendations.",
+        "resume_label": "Your Resume:",
+        "instructions": """**COMPREHENSIVE RESUME OPTIMIZATION ANALYSIS:**
 
 1. **COMPATIBILITY SCORING**: Provide detailed scores for each section with explanations.
 
@@ -181,22 +313,67 @@ Your Resume:
 6. **COMPETITIVE POSITIONING**:
    - **Unique Value Proposition**: What makes you stand out
    - **Market Positioning**: How to position yourself against other candidates
-   - **Salary Negotiation Preparation**: Strengthen your negotiation position
-
-Respond in JSON format with keys:
-- "overall_score" (number 0-100)
-- "technical_skills_score" (number 0-100)
-- "experience_score" (number 0-100)
-- "education_score" (number 0-100)
-- "resume_structure_score" (number 0-100)
-- "ats_optimization_score" (number 0-100)
-- "missing_keywords" (string)
-- "skill_development_roadmap" (string)
-- "resume_rewrite_suggestions" (string)
-- "immediate_actions" (string)
-- "certification_recommendations" (string)
-- "competitive_advantages" (string)
-- "detailed_improvement_plan" (string)
+   - **Salary Negotiation Preparation**: Strengthen your negotiation position""",
+        "keys_header": "Respond in JSON format with keys:",
+    },
+}
+
+
+def format_response_keys(user_type: str) -> str:
+    """Render the expected response keys as the bullet list used in prompts."""
+    return "\n".join(
+        f'- "{key}" ({description})' for key, description in RESPONSE_KEYS[user_type]
+    )
+
+
+def generate_user_specific_prompt(jd: str, resume: str, user_type: str) -> str:
+    """Generate tailored prompts based on user type."""
+    user_type = "HR" if user_type == "HR" else "candidate"
+    template = PROMPT_TEMPLATES[user_type]
+    return f"""
+{template["role"]}
+
+Job Description:
+{jd}
+
+{template["resume_label"]}
+{resume}
+
+{template["instructions"]}
+
+{template["keys_header"]}
+{format_response_keys(user_type)}
+"""
+
+
+def generate_multi_target_prompt(jds: dict, resume: str, user_type: str) -> str:
+    """
+    Generate one prompt that evaluates a resume against several job descriptions.
+
+    Args:
+        jds: Mapping of job description ID to job description text
+        resume: The resume text, included only once
+        user_type: Either "HR" or "candidate"
+    """
+    user_type = "HR" if user_type == "HR" else "candidate"
+    template = PROMPT_TEMPLATES[user_type]
+    job_sections = "\n\n".join(
+        f"Job Description [{job_id}]:\n{jd}" for job_id, jd in jds.items()
+    )
+    job_ids = ", ".join(f'"{job_id}"' for job_id in jds)
+    return f"""
+{template["role"]}
+Evaluate the resume independently against each of the {len(jds)} job descriptions below. Apply the full analysis to every job description separately.
+
+{template["resume_label"]}
+{resume}
+
+{job_sections}
+
+{template["instructions"]}
+
+Respond in JSON format as one object whose keys are the job description IDs ({job_ids}). The value for each ID must be an object with keys:
+{format_response_keys(user_type)}
 """
 
 
@@ -216,127 +393,262 @@ def clean_json_response(text: str) -> str:
     return text
 
 
+TRAILING_TOKEN_PATTERN = re.compile(r"[\w.+-]+$")
+
+
+def repair_json(text: str):
+    """
+    Best-effort recovery of a JSON object from wrapped or truncated AI output.
+
+    Skips any prose before the first ``{``. If the output was cut off, it keeps
+    everything up to the last complete value and closes the open objects and
+    arrays. A cut-off string or number is dropped rather than closed, since
+    ``"overall_score": 8`` may have been cut from ``85``.
+
+    Returns:
+        The parsed object, or None if nothing usable could be recovered
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    stack = []
+    in_string = escape = string_is_key = expecting_key = False
+    safe_cut, safe_stack = None, []
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                if not string_is_key:
+                    safe_cut, safe_stack = i + 1, list(stack)
+            continue
+        if ch == '"':
+            in_string = True
+            string_is_key = bool(stack) and stack[-1] == "{" and expecting_key
+        elif ch in "{[":
+            stack.append(ch)
+            expecting_key = ch == "{"
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            safe_cut, safe_stack = i + 1, list(stack)
+            expecting_key = False
+            if not stack:
+                break
+        elif ch == ":":
+            expecting_key = False
+        elif ch == ",":
+            # Whatever preceded the comma is a complete value
+            safe_cut, safe_stack = i, list(stack)
+            expecting_key = stack[-1] == "{"
+
+    def close(body: str, open_stack: list) -> str:
+        return body + "".join("}" if c == "{" else "]" for c in reversed(open_stack))
+
+    attempts = []
+    # The output may end on a complete literal, but never on a complete number
+    tail = TRAILING_TOKEN_PATTERN.search(text)
+    if not in_string and (tail is None or tail.group() in ("true", "false", "null")):
+        attempts.append(close(text[start:].rstrip(), stack))
+    if safe_cut is not None:
+        attempts.append(close(text[start:safe_cut], safe_stack))
+    for attempt in attempts:
+        try:
+            return json.loads(attempt)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def parse_ai_json(text: str):
+    """
+    Parse AI output as JSON, falling back to ``repair_json``.
+
+    Outcomes are counted under ``gemini_json.*`` in the metrics registry so the
+    parse-failure rate can be tracked.
+
+    Raises:
+        json.JSONDecodeError: If the output cannot be parsed or repaired
+    """
+    metrics.increment("gemini_json.responses")
+    text = clean_json_response(text)
+    try:
+        result = json.loads(text)
+        metrics.increment("gemini_json.parsed")
+        return result
+    except json.JSONDecodeError as e:
+        error = e
+
+    result = repair_json(text)
+    if result is not None:
+        metrics.increment("gemini_json.repaired")
+        return result
+    metrics.increment("gemini_json.parse_failures")
+    raise error
+
+
 def validate_response(result: dict, user_type: str) -> dict:
-    """Validate the AI response based on user type."""
+    """Validate the AI response against the response model for the user type."""
     if not isinstance(result, dict):
         return {"score": None, "suggestions": "Invalid response format from AI"}
 
-    # Check for required keys based on user type
-    if user_type == "HR":
-        required_keys = [
-            "overall_score",
-            "critical_gaps",
-            "hiring_recommendation",
-            "detailed_analysis",
-        ]
-    else:  # candidate
-        required_keys = [
-            "overall_score",
-            "skill_development_roadmap",
-            "detailed_improvement_plan",
+    model = RESPONSE_MODELS["HR" if user_type == "HR" else "candidate"]
+    try:
+        validated = model.model_validate(result)
+    except ValidationError as e:
+        missing_keys = [
+            str(error["loc"][0]) for error in e.errors() if error["type"] == "missing"
         ]
-
-    missing_keys = [key for key in required_keys if key not in result]
-    if missing_keys:
+        if missing_keys:
+            reason = f"Missing: {', '.join(missing_keys)}"
+        else:
+            reason = f"Invalid fields: {e.error_count()} errors"
+        metrics.increment("gemini_json.validation_failures")
+        score = result.get("overall_score")
         return {
-            "score": result.get("overall_score"),
-            "suggestions": f"Incomplete response. Missing: {', '.join(missing_keys)}. Available data: {str(result)}",
+            "score": score if isinstance(score, (int, float)) else None,
+            "suggestions": f"Incomplete response. {reason}. Available data: {str(result)}",
         }
 
-    # Validate score ranges
-    score_keys = [key for key in result.keys() if key.endswith("_score")]
-    for key in score_keys:
-        if result[key] is not None and not (0 <= result[key] <= 100):
-            result[key] = None
+    return validated.model_dump(exclude_unset=True)
 
-    return result
 
+# Token budgets for packing several job descriptions into a single Gemini call
+MULTI_JD_MAX_INPUT_TOKENS = int(os.getenv("MULTI_JD_MAX_INPUT_TOKENS", "32000"))
+MULTI_JD_MAX_OUTPUT_TOKENS = int(os.getenv("MULTI_JD_MAX_OUTPUT_TOKENS", "8192"))
+MULTI_JD_OUTPUT_TOKENS_PER_JD = int(os.getenv("MULTI_JD_OUTPUT_TOKENS_PER_JD", "1500"))
+MAX_JOB_DESCRIPTIONS = 10
 
-@router.post("/score-upload")
-async def score_upload(
-    resume: UploadFile = File(...),
-    jobDescription: str = Form(...),
-    userType: str = Form(...),
-):
-    """API endpoint to score resume vs job description using Gemini with user-specific analysis."""
 
-    # Validate user type
-    if userType not in ["HR", "candidate"]:
-        return JSONResponse(
-            status_code=400,
-            content={
-                "success": False,
-                "error": "Invalid user type. Must be either 'HR' or 'candidate'.",
-            },
-        )
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4 + 1
 
-    # Validate job description
-    if not jobDescription or jobDescription.strip() == "":
-        return JSONResponse(
-            status_code=400,
-            content={
-                "success": False,
-                "error": "Job description cannot be empty.",
-            },
+
+def pack_job_descriptions(jds: dict, resume: str, user_type: str) -> list:
+    """Greedily group job descriptions into packs that fit the token budgets."""
+    packs, current = [], {}
+    for job_id, jd in jds.items():
+        candidate = {**current, job_id: jd}
+        prompt = generate_multi_target_prompt(candidate, resume, user_type)
+        fits = (
+            estimate_tokens(prompt) <= MULTI_JD_MAX_INPUT_TOKENS
+            and len(candidate) * MULTI_JD_OUTPUT_TOKENS_PER_JD
+            <= MULTI_JD_MAX_OUTPUT_TOKENS
         )
+        if current and not fits:
+            packs.append(current)
+            current = {job_id: jd}
+        else:
+            current = candidate
+    if current:
+        packs.append(current)
+    return packs
 
-    # Extract resume text
-    resume_text = ""
-    filename = resume.filename or ""
-    filename = filename.lower()
 
-    try:
-        if filename.endswith(".pdf"):
-            resume_text = extract_text_from_pdf(resume.file)
-        elif filename.endswith(".docx"):
-            resume_text = extract_text_from_docx(resume.file)
-        else:
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "success": False,
-                    "error": "Unsupported file type. Please upload a PDF or DOCX file.",
-                },
-            )
-    except Exception as e:
-        return JSONResponse(
-            status_code=500,
-            content={
-                "success": False,
-                "error": f"Error extracting text from file: {str(e)}",
-            },
-        )
+def score_job_pack(jds: dict, resume: str, user_type: str, depth: str = "full"):
+    """
+    Score a resume against a pack of job descriptions in one Gemini call.
 
-    # Validate extracted resume text
-    if not resume_text or resume_text.strip() == "":
-        return JSONResponse(
-            status_code=400,
-            content={
-                "success": False,
-                "error": "Could not extract text from resume. Please ensure the file is not corrupted.",
-            },
-        )
+    Job descriptions whose result is missing, truncated or fails
+    ``validate_response`` are split into smaller packs and retried; a pack of
+    one falls back to the single-target prompt. Network errors and blocked or
+    malformed API payloads are reported for every job description without
+    retrying.
 
-    # Call Gemini AI model with user type
-    ai_result = get_gemini_score_and_suggestions(jobDescription, resume_text, userType)
+    Returns:
+        tuple: ``(results, llm_calls)`` where ``results`` maps each job
+        description ID to a validated result or an error dict
+    """
+    if len(jds) == 1:
+        job_id, jd = next(iter(jds.items()))
+        return {
+            job_id: get_gemini_score_and_suggestions(jd, resume, user_type, depth)
+        }, 1
 
-    print("ai_result", ai_result)
+    api_key = os.getenv("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY")
+    if not api_key or api_key == "YOUR_GEMINI_API_KEY":
+        error = {"score": None, "suggestions": "API key not configured"}
+        return {job_id: error for job_id in jds}, 0
+
+    prompt = generate_multi_target_prompt(jds, resume, user_type)
+    generation_config = {
+        "maxOutputTokens": MULTI_JD_MAX_OUTPUT_TOKENS,
+        "responseMimeType": "application/json",
+        "responseSchema": gemini_multi_response_schema(user_type, list(jds)),
+    }
+    tier = model_router.choose_tier(user_type, estimate_tokens(resume), depth)
+    payload = {}
+    try:
+        payload = model_router.call(
+            tier, lambda model: request_gemini(prompt, generation_config, model)
+        )
+        ai_text = gemini_response_text(payload)
+    except requests.exceptions.Timeout:
+        error = {"score": None, "suggestions": "Request timed out. Please try again."}
+        return {job_id: error for job_id in jds}, 1
+    except requests.exceptions.RequestException as e:
+        error = {"score": None, "suggestions": f"Network error: {str(e)}"}
+        return {job_id: error for job_id in jds}, 1
+    except (KeyError, IndexError) as e:
+        # A blocked prompt or unexpected payload shape; smaller packs of the
+        # same resume would fail the same way, so do not split
+        block_reason = payload.get("promptFeedback", {}).get("blockReason")
+        if block_reason:
+            error = {"score": None, "suggestions": f"Prompt blocked: {block_reason}"}
+        else:
+            error = {
+                "score": None,
+                "suggestions": f"Unexpected API response format: {str(e)}",
+            }
+        return {job_id: error for job_id in jds}, 1
 
-    # Handle AI service errors
-    if ai_result.get("score") is None and "failed" in ai_result.get("suggestions", ""):
-        return JSONResponse(
-            status_code=500,
-            content={
-                "success": False,
-                "error": ai_result.get("suggestions", "AI service unavailable"),
-            },
+    try:
+        result = parse_ai_json(ai_text)
+    except json.JSONDecodeError:
+        # Malformed or truncated output; retry the whole pack in smaller parts
+        result = {}
+    if gemini_output_truncated(payload) and isinstance(result, dict) and result:
+        # Results follow propertyOrdering, so only the last one can be cut
+        # off; retry it even if the repaired prefix would validate
+        result.pop(next(reversed(result)))
+
+    results, retry = {}, {}
+    for job_id, jd in jds.items():
+        per_job = result.get(job_id) if isinstance(result, dict) else None
+        validated = (
+            validate_response(per_job, user_type) if isinstance(per_job, dict) else {}
         )
+        if "overall_score" in validated:
+            results[job_id] = validated
+        else:
+            retry[job_id] = jd
+
+    llm_calls = 1
+    items = list(retry.items())
+    half = (len(items) + 1) // 2
+    for part in (items[:half], items[half:]):
+        if part:
+            part_results, part_calls = score_job_pack(
+                dict(part), resume, user_type, depth
+            )
+            results.update(part_results)
+            llm_calls += part_calls
+    return results, llm_calls
 
-    # Format response based on user type
-    if userType == "HR":
+
+def format_match_response(ai_result: dict, user_type: str) -> dict:
+    """Shape a validated AI result into the API response for the user type."""
+    if user_type == "HR":
         return {
             "success": True,
-            "userType": userType,
+            "userType": user_type,
             "data": {
                 "overall_score": ai_result.get("overall_score"),
                 "section_scores": {
@@ -362,7 +674,7 @@ async def score_upload(
     else:  # candidate
         return {
             "success": True,
-            "userType": userType,
+            "userType": user_type,
             "data": {
                 "overall_score": ai_result.get("overall_score"),
                 "section_scores": {
@@ -394,26 +706,132 @@ async def score_upload(
         }
 
 
-# Alternative endpoint for backward compatibility
-@router.post("/score-upload-legacy")
-async def score_upload_legacy(
-    resume: UploadFile = File(...), jobDescription: str = Form(...)
+# Backward-compatible duplicates of overall_score and the detailed analysis
+LEGACY_FIELDS = ("score", "suggestions")
+
+
+def parse_fields(fields: Optional[str]) -> list:
+    """Split a ``fields=a,b.c`` selector into field paths."""
+    if not fields:
+        return []
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def unknown_fields(fields: list, user_type: str, legacy: bool = True) -> list:
+    """
+    Return the requested field paths that do not exist in the response data.
+
+    With ``legacy`` off the legacy fields are not returned, so selecting them
+    counts as unknown.
+    """
+    template = select_fields(format_match_response({}, user_type)["data"], [], legacy)
+    unknown = []
+    for path in fields:
+        node = template
+        for part in path.split("."):
+            if not isinstance(node, dict) or part not in node:
+                unknown.append(path)
+                break
+            node = node[part]
+    return unknown
+
+
+def select_fields(data: dict, fields: list, legacy: bool = True) -> dict:
+    """
+    Reduce response data to the requested dotted field paths.
+
+    With ``legacy`` off the duplicated ``score``/``suggestions`` fields are
+    dropped. No ``fields`` means every remaining field is returned.
+    """
+    if not legacy:
+        data = {key: value for key, value in data.items() if key not in LEGACY_FIELDS}
+    if not fields:
+        return data
+
+    selected = {}
+    for path in fields:
+        parts = path.split(".")
+        node = data
+        for part in parts:
+            if not isinstance(node, dict) or part not in node:
+                break
+            node = node[part]
+        else:
+            target = selected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = node
+    return selected
+
+
+def describe_near_duplicate(distance: int) -> dict:
+    """The ``nearDuplicate`` block reported when an earlier analysis is reused."""
+    return {
+        "approximate": distance > 0,
+        "similarity": round(1 - distance / FINGERPRINT_BITS, 4),
+        "refreshing": False,
+    }
+
+
+def refresh_analysis(
+    jd: str, resume_text: str, user_type: str, depth: str, fingerprint: int
 ):
-    """Legacy API endpoint for backward compatibility - defaults to candidate user type."""
-    return await score_upload(resume, jobDescription, "candidate")
+    """Re-run a full analysis for a resume that was served from a near-duplicate."""
+    ai_result = get_gemini_score_and_suggestions(jd, resume_text, user_type, depth)
+    if ai_result.get("overall_score") is not None:
+        near_duplicate_index.store(jd_key(jd, user_type, depth), fingerprint, ai_result)
+
+
+def score_resume_text(
+    jd: str,
+    resume_text: str,
+    user_type: str,
+    background_tasks: BackgroundTasks = None,
+    refresh: bool = False,
+    depth: str = "full",
+):
+    """
+    Score a resume, reusing the analysis of a near-identical earlier upload.
 
+    Returns:
+        tuple: ``(ai_result, near_duplicate)`` where ``near_duplicate`` is
+        ``None`` for a fresh analysis, or describes the reused one
+    """
+    key = jd_key(jd, user_type, depth)
+    fingerprint = simhash(resume_text)
+    cached, distance = near_duplicate_index.lookup(key, fingerprint)
+    if cached is not None:
+        near_duplicate = describe_near_duplicate(distance)
+        if refresh and distance > 0 and background_tasks is not None:
+            background_tasks.add_task(
+                refresh_analysis, jd, resume_text, user_type, depth, fingerprint
+            )
+            near_duplicate["refreshing"] = True
+        return cached, near_duplicate
 
-# Additional endpoint for text-based input (no file upload)
-@router.post("/score-text")
-async def score_text(
-    resume_text: str = Form(...),
-    job_description: str = Form(...),
-    user_type: str = Form(...),
+    ai_result = get_gemini_score_and_suggestions(jd, resume_text, user_type, depth)
+    # Only complete analyses are worth reusing
+    if ai_result.get("overall_score") is not None:
+        near_duplicate_index.store(key, fingerprint, ai_result)
+    return ai_result, None
+
+
+@router.post("/score-upload")
+async def score_upload(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    resume: UploadFile = File(...),
+    jobDescription: str = Form(...),
+    userType: str = Form(...),
+    refreshApproximate: bool = Form(False),
+    depth: str = Form("full"),
+    fields: Optional[str] = Query(None),
+    legacy: bool = Query(True),
 ):
-    """API endpoint to score resume text vs job description using Gemini."""
+    """API endpoint to score resume vs job description using Gemini with user-specific analysis."""
 
-    # Validate inputs
-    if user_type not in ["HR", "candidate"]:
+    # Validate user type
+    if userType not in ["HR", "candidate"]:
         return JSONResponse(
             status_code=400,
             content={
@@ -422,16 +840,185 @@ async def score_text(
             },
         )
 
-    if not job_description or job_description.strip() == "":
+    # Validate analysis depth
+    if depth not in ["quick", "full"]:
         return JSONResponse(
             status_code=400,
             content={
                 "success": False,
-                "error": "Job description cannot be empty.",
+                "error": "Invalid depth. Must be either 'quick' or 'full'.",
             },
         )
 
-    if not resume_text or resume_text.strip() == "":
+    # Validate requested fields
+    requested_fields = parse_fields(fields)
+    unknown = unknown_fields(requested_fields, userType, legacy)
+    if unknown:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": f"Unknown fields: {', '.join(unknown)}",
+            },
+        )
+
+    # Validate job description
+    if not jobDescription or jobDescription.strip() == "":
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Job description cannot be empty.",
+            },
+        )
+
+    # Extract resume text
+    try:
+        resume_text, pages = await run_in_threadpool(
+            extract_resume, resume.filename, resume.file
+        )
+    except UnsupportedFileTypeError as e:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": str(e),
+            },
+        )
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"Error extracting text from file: {str(e)}",
+            },
+        )
+
+    # Re-estimate the admitted cost now that the real size is known
+    refine_admission(
+        request, user_type=userType, pages=pages, text_length=len(resume_text)
+    )
+
+    # Validate extracted resume text
+    if not resume_text or resume_text.strip() == "":
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Could not extract text from resume. Please ensure the file is not corrupted.",
+            },
+        )
+
+    # Call Gemini AI model with user type, unless a near-duplicate was already
+    # analysed. Run in the thread pool so the event loop (and admission control)
+    # keeps serving other requests while this one waits on Gemini.
+    ai_result, near_duplicate = await run_in_threadpool(
+        score_resume_text,
+        jobDescription,
+        resume_text,
+        userType,
+        background_tasks,
+        refresh=refreshApproximate,
+        depth=depth,
+    )
+
+    print("ai_result", ai_result)
+
+    # Handle AI service errors
+    if ai_result.get("score") is None and "failed" in ai_result.get("suggestions", ""):
+        return JSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": ai_result.get("suggestions", "AI service unavailable"),
+            },
+        )
+
+    # Format response based on user type
+    response = format_match_response(ai_result, userType)
+    response["data"] = select_fields(response["data"], requested_fields, legacy)
+    if near_duplicate:
+        response["nearDuplicate"] = near_duplicate
+    return encode_json_response(request, response, "score_upload")
+
+
+# Alternative endpoint for backward compatibility
+@router.post("/score-upload-legacy")
+async def score_upload_legacy(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    resume: UploadFile = File(...),
+    jobDescription: str = Form(...),
+):
+    """Legacy API endpoint for backward compatibility - defaults to candidate user type."""
+    return await score_upload(
+        request,
+        background_tasks,
+        resume,
+        jobDescription,
+        "candidate",
+        refreshApproximate=False,
+        depth="full",
+        fields=None,
+        legacy=True,
+    )
+
+
+# Additional endpoint for text-based input (no file upload)
+@router.post("/score-text")
+async def score_text(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    resume_text: str = Form(...),
+    job_description: str = Form(...),
+    user_type: str = Form(...),
+    refresh_approximate: bool = Form(False),
+    depth: str = Form("full"),
+    fields: Optional[str] = Query(None),
+    legacy: bool = Query(True),
+):
+    """API endpoint to score resume text vs job description using Gemini."""
+
+    # Validate inputs
+    if user_type not in ["HR", "candidate"]:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Invalid user type. Must be either 'HR' or 'candidate'.",
+            },
+        )
+
+    if depth not in ["quick", "full"]:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Invalid depth. Must be either 'quick' or 'full'.",
+            },
+        )
+
+    requested_fields = parse_fields(fields)
+    unknown = unknown_fields(requested_fields, user_type, legacy)
+    if unknown:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": f"Unknown fields: {', '.join(unknown)}",
+            },
+        )
+
+    if not job_description or job_description.strip() == "":
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Job description cannot be empty.",
+            },
+        )
+
+    if not resume_text or resume_text.strip() == "":
         return JSONResponse(
             status_code=400,
             content={
@@ -440,9 +1027,21 @@ async def score_text(
             },
         )
 
-    # Call Gemini AI model
-    ai_result = get_gemini_score_and_suggestions(
-        job_description, resume_text, user_type
+    refine_admission(
+        request,
+        user_type=user_type,
+        text_length=len(resume_text) + len(job_description),
+    )
+
+    # Call Gemini AI model, unless a near-duplicate was already analysed
+    ai_result, near_duplicate = await run_in_threadpool(
+        score_resume_text,
+        job_description,
+        resume_text,
+        user_type,
+        background_tasks,
+        refresh=refresh_approximate,
+        depth=depth,
     )
 
     print("ai_result", ai_result)
@@ -458,60 +1057,410 @@ async def score_text(
         )
 
     # Format response based on user type (same logic as score_upload)
-    if user_type == "HR":
-        return {
-            "success": True,
-            "userType": user_type,
-            "data": {
-                "overall_score": ai_result.get("overall_score"),
-                "section_scores": {
-                    "technical_skills": ai_result.get("technical_skills_score"),
-                    "experience": ai_result.get("experience_score"),
-                    "education": ai_result.get("education_score"),
-                    "cultural_fit": ai_result.get("cultural_fit_score"),
-                    "domain_expertise": ai_result.get("domain_expertise_score"),
-                },
-                "hiring_analysis": {
-                    "critical_gaps": ai_result.get("critical_gaps"),
-                    "red_flags": ai_result.get("red_flags"),
-                    "hiring_recommendation": ai_result.get("hiring_recommendation"),
-                    "interview_focus_areas": ai_result.get("interview_focus_areas"),
-                    "risk_assessment": ai_result.get("risk_assessment"),
-                },
-                "detailed_analysis": ai_result.get("detailed_analysis"),
-                "score": ai_result.get("overall_score"),
-                "suggestions": ai_result.get("detailed_analysis"),
+    response = format_match_response(ai_result, user_type)
+    response["data"] = select_fields(response["data"], requested_fields, legacy)
+    if near_duplicate:
+        response["nearDuplicate"] = near_duplicate
+    return encode_json_response(request, response, "score_text")
+
+
+def score_job_descriptions(jds: dict, resume_text: str, user_type: str, depth: str):
+    """
+    Score a resume against several job descriptions with as few LLM calls as possible.
+
+    Returns:
+        tuple: ``(ai_results, near_duplicates, llm_calls)`` where
+        ``near_duplicates`` describes the job description IDs served from the
+        near-duplicate index
+    """
+    # Reuse earlier analyses of this resume, then pack the rest into as few calls as fit
+    fingerprint = simhash(resume_text)
+    ai_results, near_duplicates, pending = {}, {}, {}
+    for job_id, jd in jds.items():
+        cached, distance = near_duplicate_index.lookup(
+            jd_key(jd, user_type, depth), fingerprint
+        )
+        if cached is not None:
+            ai_results[job_id] = cached
+            near_duplicates[job_id] = describe_near_duplicate(distance)
+        else:
+            pending[job_id] = jd
+
+    llm_calls = 0
+    for pack in pack_job_descriptions(pending, resume_text, user_type):
+        pack_results, pack_calls = score_job_pack(pack, resume_text, user_type, depth)
+        ai_results.update(pack_results)
+        llm_calls += pack_calls
+        for job_id, ai_result in pack_results.items():
+            if ai_result.get("overall_score") is not None:
+                near_duplicate_index.store(
+                    jd_key(jds[job_id], user_type, depth), fingerprint, ai_result
+                )
+    return ai_results, near_duplicates, llm_calls
+
+
+# Score one resume against several job descriptions with as few LLM calls as possible
+@router.post("/score-text-multi")
+async def score_text_multi(
+    request: Request,
+    resume_text: str = Form(...),
+    job_descriptions: List[str] = Form(...),
+    user_type: str = Form(...),
+    depth: str = Form("full"),
+    fields: Optional[str] = Query(None),
+    legacy: bool = Query(True),
+):
+    """API endpoint to score resume text against multiple job descriptions in packed Gemini calls."""
+
+    # Validate inputs
+    if user_type not in ["HR", "candidate"]:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Invalid user type. Must be either 'HR' or 'candidate'.",
             },
-        }
-    else:  # candidate
-        return {
-            "success": True,
-            "userType": user_type,
-            "data": {
-                "overall_score": ai_result.get("overall_score"),
-                "section_scores": {
-                    "technical_skills": ai_result.get("technical_skills_score"),
-                    "experience": ai_result.get("experience_score"),
-                    "education": ai_result.get("education_score"),
-                    "resume_structure": ai_result.get("resume_structure_score"),
-                    "ats_optimization": ai_result.get("ats_optimization_score"),
-                },
-                "improvement_plan": {
-                    "missing_keywords": ai_result.get("missing_keywords"),
-                    "skill_development_roadmap": ai_result.get(
-                        "skill_development_roadmap"
-                    ),
-                    "resume_rewrite_suggestions": ai_result.get(
-                        "resume_rewrite_suggestions"
-                    ),
-                    "immediate_actions": ai_result.get("immediate_actions"),
-                    "certification_recommendations": ai_result.get(
-                        "certification_recommendations"
-                    ),
-                    "competitive_advantages": ai_result.get("competitive_advantages"),
-                },
-                "detailed_improvement_plan": ai_result.get("detailed_improvement_plan"),
-                "score": ai_result.get("overall_score"),
-                "suggestions": ai_result.get("detailed_improvement_plan"),
+        )
+
+    if depth not in ["quick", "full"]:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Invalid depth. Must be either 'quick' or 'full'.",
             },
-        }
+        )
+
+    requested_fields = parse_fields(fields)
+    unknown = unknown_fields(requested_fields, user_type, legacy)
+    if unknown:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": f"Unknown fields: {', '.join(unknown)}",
+            },
+        )
+
+    if not resume_text or resume_text.strip() == "":
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Resume text cannot be empty.",
+            },
+        )
+
+    if len(job_descriptions) > MAX_JOB_DESCRIPTIONS or any(
+        not jd or jd.strip() == "" for jd in job_descriptions
+    ):
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": f"Provide between 1 and {MAX_JOB_DESCRIPTIONS} non-empty job descriptions.",
+            },
+        )
+
+    refine_admission(
+        request,
+        user_type=user_type,
+        text_length=len(resume_text) + sum(len(jd) for jd in job_descriptions),
+    )
+
+    jds = {f"jd_{i + 1}": jd for i, jd in enumerate(job_descriptions)}
+    ai_results, near_duplicates, llm_calls = await run_in_threadpool(
+        score_job_descriptions, jds, resume_text, user_type, depth
+    )
+
+    results = []
+    for index, job_id in enumerate(jds):
+        ai_result = ai_results[job_id]
+        if "overall_score" in ai_result:
+            result = {
+                "job_index": index,
+                "success": True,
+                "data": select_fields(
+                    format_match_response(ai_result, user_type)["data"],
+                    requested_fields,
+                    legacy,
+                ),
+            }
+            if job_id in near_duplicates:
+                result["nearDuplicate"] = near_duplicates[job_id]
+            results.append(result)
+        else:
+            results.append(
+                {
+                    "job_index": index,
+                    "success": False,
+                    "error": ai_result.get("suggestions", "AI service unavailable"),
+                }
+            )
+
+    response = {
+        "success": any(result["success"] for result in results),
+        "userType": user_type,
+        "data": {"results": results, "llm_calls": llm_calls},
+    }
+    return encode_json_response(request, response, "score_text_multi")
+
+
+# Limits for bulk ZIP uploads, enforced on uncompressed sizes to stop zip bombs
+ZIP_MAX_ENTRIES = int(os.getenv("ZIP_MAX_ENTRIES", "500"))
+ZIP_MAX_ENTRY_BYTES = int(os.getenv("ZIP_MAX_ENTRY_BYTES", str(10 * 1024 * 1024)))
+ZIP_MAX_TOTAL_BYTES = int(os.getenv("ZIP_MAX_TOTAL_BYTES", str(500 * 1024 * 1024)))
+ZIP_MAX_COMPRESSION_RATIO = int(os.getenv("ZIP_MAX_COMPRESSION_RATIO", "100"))
+# Every entry, including directories and __MACOSX/ or dot-file entries, counts
+# toward these. They bound the central directory zipfile loads into memory.
+ZIP_MAX_ARCHIVE_ENTRIES = int(
+    os.getenv("ZIP_MAX_ARCHIVE_ENTRIES", str(4 * ZIP_MAX_ENTRIES))
+)
+ZIP_MAX_CENTRAL_DIRECTORY_BYTES = int(
+    os.getenv("ZIP_MAX_CENTRAL_DIRECTORY_BYTES", str(256 * ZIP_MAX_ARCHIVE_ENTRIES))
+)
+# Entries are spooled to disk beyond this size, keeping memory use flat
+ZIP_SPOOL_BYTES = 1024 * 1024
+ZIP_CHUNK_BYTES = 64 * 1024
+
+
+def check_zip_directory(archive_file):
+    """
+    Check a ZIP archive's entry count and central directory size.
+
+    Both come from the end-of-central-directory record, so oversized archives
+    are rejected before ``zipfile.ZipFile`` builds an entry for every file.
+
+    Returns:
+        str: An error message, or None if the archive is within the limits
+    """
+    # The same end-record reader zipfile.is_zipfile uses; handles ZIP64
+    end_record = zipfile._EndRecData(archive_file)
+    archive_file.seek(0)
+    if end_record is None:
+        return "Uploaded file is not a valid ZIP archive."
+    if end_record[zipfile._ECD_ENTRIES_TOTAL] > ZIP_MAX_ARCHIVE_ENTRIES:
+        return f"Archive has more than {ZIP_MAX_ARCHIVE_ENTRIES} entries."
+    if end_record[zipfile._ECD_SIZE] > ZIP_MAX_CENTRAL_DIRECTORY_BYTES:
+        return "Archive directory exceeds the size limit."
+    return None
+
+
+def read_zip_entry(archive: zipfile.ZipFile, info: zipfile.ZipInfo):
+    """
+    Copy one archive entry into a spooled temp file, enforcing the size limit.
+
+    Raises:
+        ValueError: If the entry decompresses to more than ZIP_MAX_ENTRY_BYTES
+    """
+    entry = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_BYTES)
+    size = 0
+    with archive.open(info) as source:
+        while True:
+            chunk = source.read(ZIP_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > ZIP_MAX_ENTRY_BYTES:
+                entry.close()
+                raise ValueError("File exceeds the per-file size limit.")
+            entry.write(chunk)
+    entry.seek(0)
+    return entry, size
+
+
+def iter_zip_results(
+    archive_file, jd: str, user_type: str, depth: str, fields: list, legacy: bool
+):
+    """
+    Score each PDF/DOCX entry of a ZIP archive in turn, yielding NDJSON lines.
+
+    Only one entry is held at a time, so memory use does not grow with the
+    archive. Entries that are too large, too highly compressed or would push
+    the archive past its total limit are reported as errors, not read.
+    """
+    counts = {"processed": 0, "succeeded": 0, "failed": 0, "skipped": 0}
+    total_bytes = 0
+    try:
+        with zipfile.ZipFile(archive_file) as archive:
+            for index, info in enumerate(archive.infolist()):
+                if index >= ZIP_MAX_ARCHIVE_ENTRIES:
+                    yield dumps(
+                        {
+                            "type": "error",
+                            "error": f"Archive has more than {ZIP_MAX_ARCHIVE_ENTRIES} entries; remaining files were not processed.",
+                        }
+                    ) + b"\n"
+                    break
+                name = info.filename
+                basename = os.path.basename(name)
+                if info.is_dir() or name.startswith("__MACOSX/") or not basename:
+                    continue
+                if basename.startswith("."):
+                    counts["skipped"] += 1
+                    continue
+
+                result = {"type": "result", "filename": name}
+                if counts["processed"] >= ZIP_MAX_ENTRIES:
+                    yield dumps(
+                        {
+                            "type": "error",
+                            "error": f"Archive has more than {ZIP_MAX_ENTRIES} files; remaining files were not processed.",
+                        }
+                    ) + b"\n"
+                    break
+                counts["processed"] += 1
+
+                error = None
+                if not name.lower().endswith((".pdf", ".docx")):
+                    error = "Unsupported file type. Please upload a PDF or DOCX file."
+                elif info.file_size > ZIP_MAX_ENTRY_BYTES:
+                    error = "File exceeds the per-file size limit."
+                elif (
+                    info.compress_size
+                    and info.file_size / info.compress_size > ZIP_MAX_COMPRESSION_RATIO
+                ):
+                    error = "File compression ratio is suspiciously high."
+                elif total_bytes + info.file_size > ZIP_MAX_TOTAL_BYTES:
+                    yield dumps(
+                        {
+                            "type": "error",
+                            "error": "Archive exceeds the total size limit; remaining files were not processed.",
+                        }
+                    ) + b"\n"
+                    break
+
+                if error is None:
+                    try:
+                        entry, size = read_zip_entry(archive, info)
+                        total_bytes += size
+                        with entry:
+                            resume_text = extract_text_from_file(name, entry)
+                        if not resume_text or resume_text.strip() == "":
+                            error = "Could not extract text from resume."
+                    except UnsupportedFileTypeError as e:
+                        error = str(e)
+                    except Exception as e:
+                        error = f"Error extracting text from file: {str(e)}"
+
+                if error is None:
+                    ai_result, near_duplicate = score_resume_text(
+                        jd, resume_text, user_type, depth=depth
+                    )
+                    if ai_result.get("overall_score") is None:
+                        error = ai_result.get("suggestions", "AI service unavailable")
+                    else:
+                        result["success"] = True
+                        result["data"] = select_fields(
+                            format_match_response(ai_result, user_type)["data"],
+                            fields,
+                            legacy,
+                        )
+                        if near_duplicate:
+                            result["nearDuplicate"] = near_duplicate
+
+                if error is not None:
+                    result["success"] = False
+                    result["error"] = error
+                    counts["failed"] += 1
+                else:
+                    counts["succeeded"] += 1
+                yield dumps(result) + b"\n"
+    except zipfile.BadZipFile as e:
+        yield dumps({"type": "error", "error": f"Invalid ZIP archive: {e}"}) + b"\n"
+    finally:
+        archive_file.close()
+
+    yield dumps({"type": "summary", **counts}) + b"\n"
+
+
+# Bulk endpoint: score every resume in a ZIP archive against one job description
+@router.post("/score-zip")
+async def score_zip(
+    request: Request,
+    archive: UploadFile = File(...),
+    jobDescription: str = Form(...),
+    userType: str = Form(...),
+    depth: str = Form("full"),
+    fields: Optional[str] = Query(None),
+    legacy: bool = Query(True),
+):
+    """
+    API endpoint to score all PDF/DOCX resumes in a ZIP archive.
+
+    Results are streamed back as newline-delimited JSON, one line per file as
+    soon as it has been scored, followed by a summary line.
+    """
+
+    # Validate user type
+    if userType not in ["HR", "candidate"]:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Invalid user type. Must be either 'HR' or 'candidate'.",
+            },
+        )
+
+    # Validate analysis depth
+    if depth not in ["quick", "full"]:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Invalid depth. Must be either 'quick' or 'full'.",
+            },
+        )
+
+    # Validate requested fields
+    requested_fields = parse_fields(fields)
+    unknown = unknown_fields(requested_fields, userType, legacy)
+    if unknown:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": f"Unknown fields: {', '.join(unknown)}",
+            },
+        )
+
+    # Validate job description
+    if not jobDescription or jobDescription.strip() == "":
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Job description cannot be empty.",
+            },
+        )
+
+    refine_admission(request, user_type=userType)
+
+    # Take our own copy of the upload; it must outlive the request handler
+    # while the response streams, and is copied in chunks to keep memory flat
+    archive_file = tempfile.TemporaryFile()
+    await run_in_threadpool(
+        shutil.copyfileobj, archive.file, archive_file, ZIP_CHUNK_BYTES
+    )
+    archive_file.seek(0)
+    error = check_zip_directory(archive_file)
+    if error is not None:
+        archive_file.close()
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": error},
+        )
+
+    return StreamingResponse(
+        iter_zip_results(
+            archive_file, jobDescription, userType, depth, requested_fields, legacy
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+# Per-tier routing statistics: health, latency and estimated cost
+@router.get("/model-tiers")
+def model_tiers():
+    """Report call counts, latency, errors and estimated cost for each model tier."""
+    return {"success": True, "data": model_router.report()}
@@ -0,0 +1,151 @@
+"""Talent pool API routes: store resumes and search them for a job description."""
+
+import time
+from typing import List, Optional
+
+from fastapi import APIRouter, UploadFile, File, Form
+from fastapi.responses import JSONResponse
+
+from app.routers.api.v1.matching import (
+    UnsupportedFileTypeError,
+    extract_text_from_file,
+    get_gemini_score_and_suggestions,
+)
+from app.services.talent_pool import get_talent_pool
+
+router = APIRouter(prefix="/talent-pool", tags=["talent-pool"])
+
+# Upper bound on how many shortlisted resumes are sent to Gemini per search
+MAX_DEEP_ANALYSIS = 5
+MAX_TOP_K = 100
+
+
+@router.post("/resumes")
+def add_resumes(
+    resumes: List[UploadFile] = File(...),
+    candidateIds: Optional[List[str]] = Form(None),
+):
+    """Extract and index one or more resumes into the talent pool."""
+    if candidateIds and len(candidateIds) != len(resumes):
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "candidateIds must match the number of uploaded resumes.",
+            },
+        )
+
+    pool = get_talent_pool()
+    added, failed = [], []
+    for i, resume in enumerate(resumes):
+        try:
+            text = extract_text_from_file(resume.filename, resume.file)
+        except UnsupportedFileTypeError as e:
+            failed.append({"filename": resume.filename, "error": str(e)})
+            continue
+        except Exception as e:
+            failed.append(
+                {
+                    "filename": resume.filename,
+                    "error": f"Error extracting text from file: {str(e)}",
+                }
+            )
+            continue
+        if not text or text.strip() == "":
+            failed.append(
+                {"filename": resume.filename, "error": "Could not extract text."}
+            )
+            continue
+        candidate_id = pool.add(
+            text,
+            candidate_id=candidateIds[i] if candidateIds else None,
+            metadata={"filename": resume.filename},
+        )
+        added.append({"candidate_id": candidate_id, "filename": resume.filename})
+
+    return {
+        "success": bool(added),
+        "data": {"added": added, "failed": failed, "pool_size": len(pool)},
+    }
+
+
+@router.delete("/resumes/{candidate_id}")
+def remove_resume(candidate_id: str):
+    """Remove a resume from the talent pool."""
+    if not get_talent_pool().remove(candidate_id):
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "error": "Candidate not found."},
+        )
+    return {"success": True, "data": {"candidate_id": candidate_id}}
+
+
+@router.post("/flush")
+def flush_index():
+    """Compact the logged index changes into the on-disk arrays."""
+    pool = get_talent_pool()
+    pool.flush()
+    return {"success": True, "data": {"pool_size": len(pool)}}
+
+
+@router.post("/search")
+def search_candidates(
+    jobDescription: str = Form(...),
+    topK: int = Form(10),
+    deepAnalysis: bool = Form(False),
+    deepAnalysisCount: int = Form(3),
+):
+    """
+    Return the top-k stored resumes for a job description.
+
+    Candidates are ranked locally with BM25. With ``deepAnalysis`` set, only
+    the first ``deepAnalysisCount`` (at most ``MAX_DEEP_ANALYSIS``) of the
+    shortlist are sent to Gemini for a full HR analysis.
+    """
+    if not jobDescription or jobDescription.strip() == "":
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": "Job description cannot be empty.",
+            },
+        )
+    if not 1 <= topK <= MAX_TOP_K:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": f"topK must be between 1 and {MAX_TOP_K}.",
+            },
+        )
+    if not 0 <= deepAnalysisCount <= MAX_DEEP_ANALYSIS:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": f"deepAnalysisCount must be between 0 and {MAX_DEEP_ANALYSIS}.",
+            },
+        )
+
+    pool = get_talent_pool()
+    start = time.perf_counter()
+    candidates = pool.search(jobDescription, top_k=topK)
+    search_ms = (time.perf_counter() - start) * 1000
+
+    if deepAnalysis:
+        deep_count = max(0, min(deepAnalysisCount, MAX_DEEP_ANALYSIS))
+        for candidate in candidates[:deep_count]:
+            resume_text = pool.get_text(candidate["candidate_id"])
+            if resume_text:
+                candidate["analysis"] = get_gemini_score_and_suggestions(
+                    jobDescription, resume_text, "HR"
+                )
+
+    return {
+        "success": True,
+        "data": {
+            "candidates": candidates,
+            "pool_size": len(pool),
+            "search_ms": round(search_ms, 3),
+        },
+    }
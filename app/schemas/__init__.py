@@ -1,2 +1,9 @@
 from .item import Item, ItemCreate
-from .user import UserCreate, UserLogin, UserResponse 
\ No newline at end of file
+from .user import UserCreate, UserLogin, UserResponse 
+from .matching import (
+    RESPONSE_KEYS,
+    REQUIRED_RESPONSE_KEYS,
+    RESPONSE_MODELS,
+    gemini_response_schema,
+    gemini_multi_response_schema,
+)
@@ -0,0 +1,126 @@
+from typing import Optional, Union
+
+from pydantic import BaseModel, ConfigDict, create_model, field_validator
+
+# Keys the AI is asked to return per user type, with the type hint shown in prompts
+RESPONSE_KEYS = {
+    "HR": [
+        ("overall_score", "number 0-100"),
+        ("technical_skills_score", "number 0-100"),
+        ("experience_score", "number 0-100"),
+        ("education_score", "number 0-100"),
+        ("cultural_fit_score", "number 0-100"),
+        ("domain_expertise_score", "number 0-100"),
+        ("critical_gaps", "string"),
+        ("red_flags", "string"),
+        ("hiring_recommendation", "string"),
+        ("interview_focus_areas", "string"),
+        ("detailed_analysis", "string"),
+        ("risk_assessment", "string"),
+    ],
+    "candidate": [
+        ("overall_score", "number 0-100"),
+        ("technical_skills_score", "number 0-100"),
+        ("experience_score", "number 0-100"),
+        ("education_score", "number 0-100"),
+        ("resume_structure_score", "number 0-100"),
+        ("ats_optimization_score", "number 0-100"),
+        ("missing_keywords", "string"),
+        ("skill_development_roadmap", "string"),
+        ("resume_rewrite_suggestions", "string"),
+        ("immediate_actions", "string"),
+        ("certification_recommendations", "string"),
+        ("competitive_advantages", "string"),
+        ("detailed_improvement_plan", "string"),
+    ],
+}
+
+# Keys a response must contain to be usable
+REQUIRED_RESPONSE_KEYS = {
+    "HR": [
+        "overall_score",
+        "critical_gaps",
+        "hiring_recommendation",
+        "detailed_analysis",
+    ],
+    "candidate": [
+        "overall_score",
+        "skill_development_roadmap",
+        "detailed_improvement_plan",
+    ],
+}
+
+
+class AnalysisBase(BaseModel):
+    """Common validation for AI analysis responses."""
+
+    model_config = ConfigDict(extra="allow")
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def normalize_value(cls, value, info):
+        if info.field_name.endswith("_score"):
+            # Out-of-range or non-numeric scores are dropped rather than rejected
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return None
+            if not 0 <= value <= 100:
+                return None
+            return int(value) if value.is_integer() else value
+        # Text fields: join lists and stringify stray scalars rather than
+        # rejecting an otherwise complete analysis
+        if isinstance(value, list):
+            return "\n".join(str(item) for item in value)
+        if isinstance(value, (int, float, bool)):
+            return str(value)
+        return value
+
+
+def build_response_model(user_type: str) -> type:
+    """Create the Pydantic model for a user type from its response key lists."""
+    required = set(REQUIRED_RESPONSE_KEYS[user_type])
+    fields = {}
+    for key, description in RESPONSE_KEYS[user_type]:
+        field_type = (
+            Optional[Union[int, float]]
+            if description.startswith("number")
+            else Optional[str]
+        )
+        fields[key] = (field_type, ... if key in required else None)
+    return create_model(
+        f"{user_type.capitalize()}Analysis", __base__=AnalysisBase, **fields
+    )
+
+
+RESPONSE_MODELS = {
+    user_type: build_response_model(user_type) for user_type in RESPONSE_KEYS
+}
+
+
+def gemini_response_schema(user_type: str) -> dict:
+    """Build the Gemini ``responseSchema`` for a single analysis."""
+    properties = {
+        key: {
+            "type": "NUMBER" if description.startswith("number") else "STRING",
+            "description": description,
+        }
+        for key, description in RESPONSE_KEYS[user_type]
+    }
+    return {
+        "type": "OBJECT",
+        "properties": properties,
+        "required": REQUIRED_RESPONSE_KEYS[user_type],
+        "propertyOrdering": [key for key, _ in RESPONSE_KEYS[user_type]],
+    }
+
+
+def gemini_multi_response_schema(user_type: str, job_ids: list) -> dict:
+    """Build the Gemini ``responseSchema`` for one analysis per job description ID."""
+    analysis = gemini_response_schema(user_type)
+    return {
+        "type": "OBJECT",
+        "properties": {job_id: analysis for job_id in job_ids},
+        "required": list(job_ids),
+        "propertyOrdering": list(job_ids),
+    }
@@ -0,0 +1,7 @@
+from .talent_pool import TalentPoolIndex, get_talent_pool
+from .near_duplicate import NearDuplicateIndex, near_duplicate_index, simhash
+from .metrics import MetricsRegistry, metrics
+from .model_router import ModelRouter, model_router
+from .json_response import encode_json_response
+from .admission import AdmissionController, AdmissionMiddleware, admission_controller
+from .profiling import ProfilingMiddleware, profile_span
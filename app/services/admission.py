@@ -0,0 +1,345 @@
+"""Cost-based admission control that sheds excess load before request bodies are read."""
+
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+from app.services.metrics import metrics
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# Budgets are in cost units; one unit is roughly one second of worker time
+ADMISSION_WORKER_BUDGET = float(os.getenv("ADMISSION_WORKER_BUDGET", "16"))
+ADMISSION_GLOBAL_BUDGET = float(os.getenv("ADMISSION_GLOBAL_BUDGET", "64"))
+# Workers on the same host share in-flight totals through files in this directory
+ADMISSION_STATE_DIR = os.getenv(
+    "ADMISSION_STATE_DIR",
+    os.path.join(tempfile.gettempdir(), "resume-matcher-admission"),
+)
+# How often each worker publishes its total and re-reads the other workers'
+ADMISSION_REFRESH_SECONDS = float(os.getenv("ADMISSION_REFRESH_SECONDS", "0.25"))
+
+# Only POST requests under these prefixes are admission-controlled
+ADMISSION_PATH_PREFIXES = ("/api/v1/matching/", "/api/v1/talent-pool/")
+# Fixed cost per route, mostly the expected wait on Gemini
+ROUTE_BASE_COST = {
+    "/api/v1/matching/score-upload": 2.0,
+    "/api/v1/matching/score-upload-legacy": 2.0,
+    "/api/v1/matching/score-text": 2.0,
+    "/api/v1/matching/score-text-multi": 4.0,
+    "/api/v1/matching/score-zip": 2.0,
+    "/api/v1/talent-pool/resumes": 0.2,
+    "/api/v1/talent-pool/search": 0.5,
+}
+DEFAULT_BASE_COST = 1.0
+# Routes whose body is a resume file rather than text
+UPLOAD_ROUTES = {
+    "/api/v1/matching/score-upload",
+    "/api/v1/matching/score-upload-legacy",
+    "/api/v1/matching/score-zip",
+    "/api/v1/talent-pool/resumes",
+}
+# Routes that score their upload one entry at a time cost one in-flight
+# analysis however large the body is
+SEQUENTIAL_ROUTES = {"/api/v1/matching/score-zip"}
+USER_TYPE_MULTIPLIER = {"HR": 1.5, "candidate": 1.0}
+BYTES_PER_PAGE = 100_000
+CHARS_PER_PAGE = 3_000
+PAGE_COST = 0.05
+TEXT_COST_PER_10K_CHARS = 0.5
+
+
+def estimate_cost(
+    path: str,
+    content_length: int = 0,
+    user_type: str = None,
+    pages: int = None,
+    text_length: int = None,
+) -> float:
+    """
+    Estimate the worker time a request will take, in cost units.
+
+    Before the body is read only the upload size is known, so page count and
+    text length are derived from it; callers can re-estimate with the real
+    values once the resume has been extracted.
+    """
+    if path in SEQUENTIAL_ROUTES:
+        content_length = 0
+    if pages is None:
+        if path not in UPLOAD_ROUTES:
+            pages = 0
+        elif text_length is not None:
+            pages = math.ceil(text_length / CHARS_PER_PAGE)
+        else:
+            pages = math.ceil(content_length / BYTES_PER_PAGE)
+    if text_length is None:
+        text_length = (
+            pages * CHARS_PER_PAGE if path in UPLOAD_ROUTES else content_length
+        )
+    # Unknown user types are costed as the more expensive HR analysis
+    multiplier = USER_TYPE_MULTIPLIER.get(user_type, USER_TYPE_MULTIPLIER["HR"])
+    return (
+        ROUTE_BASE_COST.get(path, DEFAULT_BASE_COST) * multiplier
+        + pages * PAGE_COST
+        + text_length / 10_000 * TEXT_COST_PER_10K_CHARS
+    )
+
+
+class AdmissionTicket:
+    """The cost reserved for one admitted request."""
+
+    def __init__(self, cost: float):
+        self.cost = cost
+        self.started_at = time.perf_counter()
+
+
+class AdmissionController:
+    """
+    Track in-flight cost against per-worker and global budgets.
+
+    Admission decisions only read in-memory totals, so the event loop never
+    waits on disk or on other workers. A background thread publishes this
+    worker's total as one small file per process in ``ADMISSION_STATE_DIR``
+    and sums the other workers' files every ``ADMISSION_REFRESH_SECONDS``.
+    The global budget is checked against that view, so simultaneous bursts
+    on several workers can overshoot it briefly. A request is always
+    admitted when nothing else is in flight, so a single request larger than
+    a budget can still run.
+    """
+
+    def __init__(
+        self,
+        worker_budget: float = ADMISSION_WORKER_BUDGET,
+        global_budget: float = ADMISSION_GLOBAL_BUDGET,
+        state_dir: str = ADMISSION_STATE_DIR,
+    ):
+        self.worker_budget = worker_budget
+        self.global_budget = global_budget
+        self.state_dir = state_dir
+        self.lock = threading.Lock()
+        self.in_flight_cost = 0.0
+        self.in_flight_requests = 0
+        self.other_workers_cost = 0.0
+        self.admitted = 0
+        self.rejected_worker = 0
+        self.rejected_global = 0
+        # Moving average of request duration, used for Retry-After
+        self.avg_seconds = 5.0
+        self.state_file = None
+        self.refresher_pid = None
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    def _ensure_refresher(self):
+        # Started lazily, and again after a fork, since threads do not survive it
+        if self.refresher_pid == os.getpid():
+            return
+        self.refresher_pid = os.getpid()
+        self.state_file = os.path.join(self.state_dir, f"{os.getpid()}.inflight")
+        atexit.register(self._remove_state_file, self.state_file)
+        threading.Thread(
+            target=self._refresh_loop, name="admission-refresh", daemon=True
+        ).start()
+
+    def _refresh_loop(self):
+        while True:
+            self.refresh()
+            time.sleep(ADMISSION_REFRESH_SECONDS)
+
+    def refresh(self):
+        """Publish this worker's in-flight cost and re-read the other workers'."""
+        with self.lock:
+            cost = self.in_flight_cost
+        try:
+            self._publish(cost)
+            other_cost = self._read_other_workers()
+        except OSError:
+            return
+        with self.lock:
+            self.other_workers_cost = other_cost
+
+    def _publish(self, cost: float):
+        tmp = f"{self.state_file}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(cost))
+        os.replace(tmp, self.state_file)
+
+    @staticmethod
+    def _remove_state_file(state_file: str):
+        if os.path.exists(state_file):
+            os.remove(state_file)
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        if os.name == "nt":
+            # os.kill would terminate the process on Windows
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _read_other_workers(self) -> float:
+        """Sum the published in-flight cost of every other live worker."""
+        total = 0.0
+        for name in os.listdir(self.state_dir):
+            if not name.endswith(".inflight"):
+                continue
+            path = os.path.join(self.state_dir, name)
+            if path == self.state_file:
+                continue
+            try:
+                pid = int(name.split(".")[0])
+                if not self._pid_alive(pid):
+                    os.remove(path)
+                    continue
+                with open(path, "r") as f:
+                    total += float(f.read() or 0)
+            except (ValueError, OSError):
+                continue
+        return total
+
+    def retry_after(self) -> int:
+        return max(1, round(self.avg_seconds))
+
+    def try_acquire(self, cost: float):
+        """
+        Reserve ``cost`` if both budgets allow it.
+
+        Returns:
+            tuple: ``(ticket, None)`` when admitted, or ``(None, reason)``
+            with reason "worker" or "global" when the request is shed
+        """
+        with self.lock:
+            self._ensure_refresher()
+            if (
+                self.in_flight_cost > 0
+                and self.in_flight_cost + cost > self.worker_budget
+            ):
+                self.rejected_worker += 1
+                metrics.increment("admission.rejected_worker")
+                return None, "worker"
+            global_cost = self.in_flight_cost + self.other_workers_cost
+            if global_cost > 0 and global_cost + cost > self.global_budget:
+                self.rejected_global += 1
+                metrics.increment("admission.rejected_global")
+                return None, "global"
+            self.in_flight_cost += cost
+            self.in_flight_requests += 1
+            self.admitted += 1
+        metrics.increment("admission.admitted")
+        return AdmissionTicket(cost), None
+
+    def adjust(self, ticket: AdmissionTicket, cost: float):
+        """Replace a ticket's estimate once the real request size is known."""
+        with self.lock:
+            self.in_flight_cost += cost - ticket.cost
+            ticket.cost = cost
+
+    def release(self, ticket: AdmissionTicket):
+        elapsed = time.perf_counter() - ticket.started_at
+        with self.lock:
+            self.in_flight_cost = max(0.0, self.in_flight_cost - ticket.cost)
+            self.in_flight_requests -= 1
+            self.avg_seconds = 0.9 * self.avg_seconds + 0.1 * elapsed
+
+    def stats(self) -> dict:
+        with self.lock:
+            global_cost = self.in_flight_cost + self.other_workers_cost
+            return {
+                "enabled": ADMISSION_ENABLED,
+                "admitted": self.admitted,
+                "rejected_worker": self.rejected_worker,
+                "rejected_global": self.rejected_global,
+                "in_flight_requests": self.in_flight_requests,
+                "in_flight_cost": round(self.in_flight_cost, 3),
+                "worker_budget": self.worker_budget,
+                "global_in_flight_cost": round(global_cost, 3),
+                "global_budget": self.global_budget,
+                "avg_request_seconds": round(self.avg_seconds, 3),
+            }
+
+
+admission_controller = AdmissionController()
+
+
+def refine_admission(request, **estimate):
+    """Re-estimate an admitted request's cost, e.g. with its extracted text length."""
+    ticket = getattr(request.state, "admission_ticket", None)
+    if ticket is not None:
+        admission_controller.adjust(ticket, estimate_cost(request.url.path, **estimate))
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that admits or sheds requests from their headers alone.
+
+    Shedding happens before the body is received, so rejected uploads are
+    never spooled. Per-worker overload returns 503 and global overload 429,
+    both with Retry-After. The user type is taken from the ``X-User-Type``
+    header or ``userType`` query parameter when a client sends one; form
+    fields are only readable after admission, so endpoints apply the form's
+    user type through ``refine_admission``.
+    """
+
+    def __init__(self, app, controller: AdmissionController = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not ADMISSION_ENABLED
+            or scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].startswith(ADMISSION_PATH_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        try:
+            content_length = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            content_length = 0
+        query = dict(
+            pair.split("=", 1)
+            for pair in scope.get("query_string", b"").decode().split("&")
+            if "=" in pair
+        )
+        user_type = (
+            headers.get(b"x-user-type", b"").decode("latin-1")
+            or query.get("userType")
+            or query.get("user_type")
+        )
+        cost = estimate_cost(scope["path"], content_length, user_type)
+
+        ticket, reason = self.controller.try_acquire(cost)
+        if ticket is None:
+            status = 503 if reason == "worker" else 429
+            body = json.dumps(
+                {"success": False, "error": "Server is busy. Please retry later."}
+            ).encode()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": status,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"retry-after", str(self.controller.retry_after()).encode()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        scope.setdefault("state", {})["admission_ticket"] = ticket
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(ticket)
@@ -0,0 +1,101 @@
+"""Fast JSON serialization with negotiated gzip/brotli compression for API responses."""
+
+import gzip
+import json
+import os
+import time
+
+from fastapi import Request, Response
+
+from app.services.metrics import metrics
+from app.services.profiling import profile_span
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library json module
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli is only offered when installed
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def dumps(content) -> bytes:
+    """Serialize to compact UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def negotiate_encoding(accept_encoding: str):
+    """Pick "br" or "gzip" from an Accept-Encoding header, or None for identity."""
+    offered = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            offered[name.strip().lower()] = quality
+
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    for encoding in supported:
+        quality = offered.get(encoding, offered.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def encode_json_response(
+    request: Request, content, endpoint: str, status_code: int = 200
+) -> Response:
+    """
+    Serialize ``content`` and compress it if the client accepts it.
+
+    Raw and on-the-wire payload sizes and serialization/compression times are
+    recorded per endpoint under ``response.<endpoint>.*``.
+    """
+    start = time.perf_counter()
+    with profile_span("response_serialize"):
+        body = dumps(content)
+    serialized = time.perf_counter()
+
+    encoding = None
+    if len(body) >= COMPRESSION_MIN_BYTES:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    with profile_span("response_compress"):
+        if encoding == "br":
+            wire = brotli.compress(body, quality=BROTLI_QUALITY)
+        elif encoding == "gzip":
+            wire = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        else:
+            wire = body
+    compressed = time.perf_counter()
+
+    metrics.observe(f"response.{endpoint}.bytes", len(body))
+    metrics.observe(f"response.{endpoint}.wire_bytes", len(wire))
+    metrics.observe(f"response.{endpoint}.serialize_ms", (serialized - start) * 1000)
+    metrics.observe(
+        f"response.{endpoint}.compress_ms", (compressed - serialized) * 1000
+    )
+
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=wire,
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,40 @@
+"""In-process counters and timing summaries exposed on the /metrics endpoint."""
+
+import threading
+from collections import defaultdict
+
+
+class MetricsRegistry:
+    """Thread-safe named counters and value summaries (count/total/max)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(int)
+        self.summaries = {}
+
+    def increment(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def observe(self, name: str, value: float):
+        with self.lock:
+            summary = self.summaries.setdefault(
+                name, {"count": 0, "total": 0.0, "max": 0.0}
+            )
+            summary["count"] += 1
+            summary["total"] += value
+            summary["max"] = max(summary["max"], value)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            summaries = {
+                name: {
+                    **summary,
+                    "mean": summary["total"] / summary["count"],
+                }
+                for name, summary in self.summaries.items()
+            }
+            return {"counters": dict(self.counters), "summaries": summaries}
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,206 @@
+"""Pick a Gemini model tier per request and track per-tier latency, errors and cost."""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from app.services.metrics import metrics
+
+# Ordered from cheapest/fastest to most capable. Override with a JSON list in
+# GEMINI_MODEL_TIERS using the same keys.
+DEFAULT_MODEL_TIERS = [
+    {
+        "name": "lite",
+        "model": "gemini-1.5-flash-8b",
+        "input_cost_per_million": 0.0375,
+        "output_cost_per_million": 0.15,
+    },
+    {
+        "name": "standard",
+        "model": "gemini-1.5-flash-latest",
+        "input_cost_per_million": 0.075,
+        "output_cost_per_million": 0.30,
+    },
+    {
+        "name": "deep",
+        "model": "gemini-1.5-pro-latest",
+        "input_cost_per_million": 1.25,
+        "output_cost_per_million": 5.00,
+    },
+]
+
+# Resumes longer than this (estimated tokens) start one tier higher for full HR
+# analyses. Measured on the resume alone, so packing several job descriptions
+# into one prompt does not push a call onto the expensive tier.
+ROUTER_LONG_RESUME_TOKENS = int(os.getenv("ROUTER_LONG_RESUME_TOKENS", "5000"))
+# Results below this confidence (0-1) are re-run on the next tier up
+ROUTER_MIN_CONFIDENCE = float(os.getenv("ROUTER_MIN_CONFIDENCE", "0.6"))
+ROUTER_MAX_ESCALATIONS = int(os.getenv("ROUTER_MAX_ESCALATIONS", "1"))
+# Health is judged over the last ROUTER_HEALTH_WINDOW calls of each tier made
+# within ROUTER_HEALTH_MAX_AGE_SECONDS. Older samples age out, so a tier skipped
+# for being unhealthy is tried again once its bad samples expire.
+ROUTER_HEALTH_WINDOW = int(os.getenv("ROUTER_HEALTH_WINDOW", "50"))
+ROUTER_HEALTH_MAX_AGE_SECONDS = float(os.getenv("ROUTER_HEALTH_MAX_AGE_SECONDS", "120"))
+ROUTER_MIN_SAMPLES = int(os.getenv("ROUTER_MIN_SAMPLES", "5"))
+ROUTER_MAX_ERROR_RATE = float(os.getenv("ROUTER_MAX_ERROR_RATE", "0.5"))
+ROUTER_MAX_P95_SECONDS = float(os.getenv("ROUTER_MAX_P95_SECONDS", "30"))
+
+
+def percentile(values: list, fraction: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ModelTier:
+    """A configured model plus its running call statistics."""
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        input_cost_per_million: float = 0.0,
+        output_cost_per_million: float = 0.0,
+    ):
+        self.name = name
+        self.model = model
+        self.input_cost_per_million = input_cost_per_million
+        self.output_cost_per_million = output_cost_per_million
+        self.calls = 0
+        self.errors = 0
+        self.escalations = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+        self.total_latency = 0.0
+        # (recorded at, latency, succeeded)
+        self.window = deque(maxlen=ROUTER_HEALTH_WINDOW)
+
+    def recent_samples(self) -> list:
+        cutoff = time.monotonic() - ROUTER_HEALTH_MAX_AGE_SECONDS
+        while self.window and self.window[0][0] < cutoff:
+            self.window.popleft()
+        return [(latency, ok) for _, latency, ok in self.window]
+
+    def healthy(self) -> bool:
+        samples = self.recent_samples()
+        if len(samples) < ROUTER_MIN_SAMPLES:
+            return True
+        error_rate = sum(1 for _, ok in samples if not ok) / len(samples)
+        p95 = percentile([latency for latency, _ in samples], 0.95)
+        return error_rate <= ROUTER_MAX_ERROR_RATE and p95 <= ROUTER_MAX_P95_SECONDS
+
+    def report(self) -> dict:
+        latencies = [latency for latency, _ in self.recent_samples()]
+        return {
+            "name": self.name,
+            "model": self.model,
+            "healthy": self.healthy(),
+            "calls": self.calls,
+            "errors": self.errors,
+            "escalations": self.escalations,
+            "mean_latency_seconds": (
+                self.total_latency / self.calls if self.calls else None
+            ),
+            "p50_latency_seconds": percentile(latencies, 0.5),
+            "p95_latency_seconds": percentile(latencies, 0.95),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+class ModelRouter:
+    """
+    Route requests across model tiers.
+
+    A request starts on a tier chosen from its depth, user type and resume
+    length, moving to the nearest healthy tier if that one is erroring or
+    slow. Callers can then escalate a low-confidence result one tier up.
+    """
+
+    def __init__(self, tiers: list):
+        self.tiers = [ModelTier(**tier) for tier in tiers]
+        self.lock = threading.Lock()
+
+    def choose_tier(self, user_type: str, resume_tokens: int, depth: str) -> ModelTier:
+        if depth == "quick":
+            preferred = 0
+        elif user_type == "HR" and resume_tokens > ROUTER_LONG_RESUME_TOKENS:
+            preferred = 2
+        else:
+            preferred = 1
+        preferred = min(preferred, len(self.tiers) - 1)
+
+        # Prefer the nearest healthy tier above, then below, the preferred one
+        order = list(range(preferred, len(self.tiers))) + list(
+            range(preferred - 1, -1, -1)
+        )
+        with self.lock:
+            for index in order:
+                if self.tiers[index].healthy():
+                    return self.tiers[index]
+        return self.tiers[preferred]
+
+    def escalation_tier(self, tier: ModelTier, confidence: float, escalations: int):
+        """Return the next tier up if a result is not confident enough, else None."""
+        if confidence >= ROUTER_MIN_CONFIDENCE or escalations >= ROUTER_MAX_ESCALATIONS:
+            return None
+        index = self.tiers.index(tier)
+        if index + 1 >= len(self.tiers):
+            return None
+        with self.lock:
+            tier.escalations += 1
+        metrics.increment(f"model_tier.{tier.name}.escalations")
+        return self.tiers[index + 1]
+
+    def call(self, tier: ModelTier, request_fn):
+        """
+        Run ``request_fn(model)`` on a tier, recording latency, tokens and cost.
+
+        ``request_fn`` must return the Gemini response payload; exceptions are
+        counted as errors and re-raised.
+        """
+        start = time.perf_counter()
+        try:
+            payload = request_fn(tier.model)
+        except Exception:
+            self._record(tier, time.perf_counter() - start, False, {})
+            raise
+        self._record(
+            tier, time.perf_counter() - start, True, payload.get("usageMetadata", {})
+        )
+        return payload
+
+    def _record(self, tier: ModelTier, latency: float, ok: bool, usage: dict):
+        input_tokens = usage.get("promptTokenCount", 0)
+        output_tokens = usage.get("candidatesTokenCount", 0)
+        cost = (
+            input_tokens * tier.input_cost_per_million
+            + output_tokens * tier.output_cost_per_million
+        ) / 1_000_000
+        with self.lock:
+            tier.calls += 1
+            tier.errors += 0 if ok else 1
+            tier.input_tokens += input_tokens
+            tier.output_tokens += output_tokens
+            tier.cost_usd += cost
+            tier.total_latency += latency
+            tier.window.append((time.monotonic(), latency, ok))
+        metrics.observe(f"model_tier.{tier.name}.latency_seconds", latency)
+        if not ok:
+            metrics.increment(f"model_tier.{tier.name}.errors")
+
+    def report(self) -> list:
+        with self.lock:
+            return [tier.report() for tier in self.tiers]
+
+
+model_router = ModelRouter(
+    json.loads(os.environ["GEMINI_MODEL_TIERS"])
+    if os.getenv("GEMINI_MODEL_TIERS")
+    else DEFAULT_MODEL_TIERS
+)
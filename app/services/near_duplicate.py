@@ -0,0 +1,135 @@
+"""SimHash fingerprints and an LSH index for reusing analyses of near-identical resumes."""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+
+# Maximum Hamming distance (out of 64 bits) for two resumes to count as duplicates
+NEAR_DUP_MAX_DISTANCE = int(os.getenv("NEAR_DUP_MAX_DISTANCE", "3"))
+NEAR_DUP_MAX_ENTRIES = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "10000"))
+NEAR_DUP_TTL_SECONDS = int(os.getenv("NEAR_DUP_TTL_SECONDS", "86400"))
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+WORD_PATTERN = re.compile(r"\w+")
+BIT_SHIFTS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+
+def simhash(text: str) -> int:
+    """Return a 64-bit SimHash of the word 3-gram shingles in ``text``."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [
+            " ".join(words[i : i + SHINGLE_SIZE])
+            for i in range(len(words) - SHINGLE_SIZE + 1)
+        ]
+    hashes = np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(s.encode(), digest_size=8).digest(), "little"
+            )
+            for s in shingles
+        ],
+        dtype=np.uint64,
+    )
+    bits = (hashes[:, None] >> BIT_SHIFTS) & np.uint64(1)
+    votes = 2 * bits.sum(axis=0, dtype=np.int64) - len(hashes)
+    return int(np.dot((votes > 0).astype(np.uint64), np.uint64(1) << BIT_SHIFTS))
+
+
+def jd_key(jd: str, user_type: str, depth: str = "full") -> str:
+    """Key analyses by user type, depth and whitespace/case-normalised job description."""
+    normalized = " ".join(jd.lower().split())
+    return hashlib.sha256(f"{user_type}\n{depth}\n{normalized}".encode()).hexdigest()
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of previously analysed resumes, scoped per job description.
+
+    Each fingerprint is split into ``max_distance + 1`` bands. By the
+    pigeonhole principle, two fingerprints within ``max_distance`` bits of
+    each other agree exactly on at least one band, so a lookup only compares
+    against entries sharing a band bucket instead of scanning the cache.
+    """
+
+    def __init__(
+        self,
+        max_distance: int = NEAR_DUP_MAX_DISTANCE,
+        max_entries: int = NEAR_DUP_MAX_ENTRIES,
+        ttl_seconds: int = NEAR_DUP_TTL_SECONDS,
+    ):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        n_bands = max_distance + 1
+        edges = [round(i * FINGERPRINT_BITS / n_bands) for i in range(n_bands + 1)]
+        self.bands = [
+            (start, (1 << (end - start)) - 1) for start, end in zip(edges, edges[1:])
+        ]
+        self.entries = OrderedDict()  # (jd key, fingerprint) -> (result, stored at)
+        self.buckets = defaultdict(set)  # (jd key, band, value) -> fingerprints
+        self.lock = threading.Lock()
+
+    def _band_keys(self, key: str, fingerprint: int):
+        for band, (shift, mask) in enumerate(self.bands):
+            yield (key, band, (fingerprint >> shift) & mask)
+
+    def _evict(self, entry_key):
+        self.entries.pop(entry_key, None)
+        key, fingerprint = entry_key
+        for bucket_key in self._band_keys(key, fingerprint):
+            bucket = self.buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del self.buckets[bucket_key]
+
+    def lookup(self, key: str, fingerprint: int):
+        """
+        Find the closest stored analysis for the same job description.
+
+        Returns:
+            tuple: ``(result, distance)`` for the nearest entry within
+            ``max_distance`` bits, or ``(None, None)`` if there is none
+        """
+        now = time.time()
+        best, best_distance = None, None
+        with self.lock:
+            candidates = set()
+            for bucket_key in self._band_keys(key, fingerprint):
+                candidates.update(self.buckets.get(bucket_key, ()))
+            for other in candidates:
+                distance = bin(fingerprint ^ other).count("1")
+                if distance > self.max_distance:
+                    continue
+                entry_key = (key, other)
+                result, stored_at = self.entries[entry_key]
+                if now - stored_at > self.ttl_seconds:
+                    self._evict(entry_key)
+                    continue
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = result, distance
+                    self.entries.move_to_end(entry_key)
+        return best, best_distance
+
+    def store(self, key: str, fingerprint: int, result: dict):
+        """Remember an analysis, evicting the least recently used beyond capacity."""
+        with self.lock:
+            entry_key = (key, fingerprint)
+            self.entries[entry_key] = (result, time.time())
+            self.entries.move_to_end(entry_key)
+            for bucket_key in self._band_keys(key, fingerprint):
+                self.buckets[bucket_key].add(fingerprint)
+            while len(self.entries) > self.max_entries:
+                self._evict(next(iter(self.entries)))
+
+
+near_duplicate_index = NearDuplicateIndex()
@@ -0,0 +1,222 @@
+"""Opt-in per-request profiling: timed spans plus cProfile capture, stored for download."""
+
+import contextvars
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from starlette.concurrency import run_in_threadpool
+
+# Requests carrying "X-Profile: 1" and a matching "X-Admin-Token" are profiled.
+# On-demand profiling is off while no token is configured.
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN", "")
+# Fraction of all requests profiled continuously (0 disables sampling). Sampled
+# requests record spans only; cProfile is reserved for on-demand requests.
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", "profiles")
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "100"))
+PROFILING_TOP_FUNCTIONS = 25
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+_current_profile = contextvars.ContextVar("current_profile", default=None)
+# Only one cProfile session can be active per process
+_cprofile_lock = threading.Lock()
+
+
+def is_admin_token(token: str) -> bool:
+    """Check a token against PROFILING_ADMIN_TOKEN in constant time."""
+    # Compare bytes: compare_digest rejects str arguments with non-ASCII characters
+    return bool(PROFILING_ADMIN_TOKEN) and hmac.compare_digest(
+        (token or "").encode("utf-8"), PROFILING_ADMIN_TOKEN.encode("utf-8")
+    )
+
+
+class RequestProfile:
+    """Timing data collected for one profiled request."""
+
+    def __init__(self, method: str, path: str, mode: str):
+        self.id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.mode = mode
+        self.status = None
+        self.spans = []
+        self.profiler = None
+        self.started_at = time.time()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+
+    def summary(self, wall: float, cpu: float) -> dict:
+        top_functions = []
+        if self.profiler is not None:
+            stream = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=stream)
+            stats.sort_stats("cumulative").print_stats(PROFILING_TOP_FUNCTIONS)
+            top_functions = stream.getvalue().splitlines()
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "mode": self.mode,
+            "status": self.status,
+            "started_at": self.started_at,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            # Time the event loop thread spent not running this request's code:
+            # awaiting I/O, the thread pool, or other requests
+            "wait_seconds": max(0.0, wall - cpu),
+            "cprofile": self.profiler is not None,
+            "spans": self.spans,
+            "top_functions": top_functions,
+        }
+
+
+@contextmanager
+def profile_span(name: str):
+    """
+    Time a block of work for the current profiled request.
+
+    Records wall and thread CPU time; their difference is time spent waiting
+    (network, disk, locks). Does nothing beyond a context lookup when the
+    request is not being profiled.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        profile.spans.append(
+            {
+                "name": name,
+                "offset_seconds": wall_start - profile.wall_start,
+                "wall_seconds": wall,
+                "cpu_seconds": cpu,
+                "wait_seconds": max(0.0, wall - cpu),
+            }
+        )
+
+
+def profile_path(profile_id: str, extension: str):
+    """Return the stored file for a profile ID, or None if the ID is malformed."""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    return os.path.join(PROFILING_DIR, f"{profile_id}.{extension}")
+
+
+def list_profiles() -> list:
+    """Summaries of stored profiles, newest first, without the function listings."""
+    if not os.path.isdir(PROFILING_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(PROFILING_DIR), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(PROFILING_DIR, name), "r") as f:
+            summary = json.load(f)
+        summary.pop("top_functions", None)
+        summary.pop("spans", None)
+        profiles.append(summary)
+    return profiles
+
+
+def _store(profile: RequestProfile, wall: float, cpu: float):
+    os.makedirs(PROFILING_DIR, exist_ok=True)
+    if profile.profiler is not None:
+        profile.profiler.dump_stats(profile_path(profile.id, "prof"))
+    with open(profile_path(profile.id, "json"), "w") as f:
+        json.dump(profile.summary(wall, cpu), f, indent=2)
+
+    # Keep only the newest PROFILING_MAX_PROFILES profiles
+    summaries = sorted(
+        name for name in os.listdir(PROFILING_DIR) if name.endswith(".json")
+    )
+    for name in summaries[:-PROFILING_MAX_PROFILES]:
+        profile_id = name[: -len(".json")]
+        for extension in ("json", "prof"):
+            path = profile_path(profile_id, extension)
+            if path and os.path.exists(path):
+                os.remove(path)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles authorized or sampled requests.
+
+    Both modes record timed spans, which follow the request into the thread
+    pool and are the precise per-request breakdown. Sampled requests record
+    nothing else, so continuous sampling stays cheap. On-demand requests
+    also run cProfile on the event loop thread. It captures routing,
+    validation and response encoding, and also sees other requests
+    interleaved on the loop. It sees nothing that runs in the thread pool:
+    resume extraction and Gemini calls handed off by the matching endpoints,
+    sync ``def`` endpoints such as the talent-pool routes, and the
+    ``score-zip`` result generator; use the spans for those. Unprofiled
+    requests only pay for a header check.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _mode(self, scope):
+        if scope["type"] != "http":
+            return None
+        if PROFILING_ADMIN_TOKEN:
+            headers = dict(scope["headers"])
+            if headers.get(b"x-profile", b"").lower() in (b"1", b"true"):
+                token = headers.get(b"x-admin-token", b"").decode("latin-1")
+                if is_admin_token(token):
+                    return "on-demand"
+        if PROFILING_SAMPLE_RATE and random.random() < PROFILING_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        mode = self._mode(scope)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], mode)
+        token = _current_profile.set(profile)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", []))
+                    + [(b"x-profile-id", profile.id.encode())],
+                }
+            await send(message)
+
+        if mode == "on-demand" and _cprofile_lock.acquire(blocking=False):
+            profile.profiler = cProfile.Profile()
+        try:
+            if profile.profiler is not None:
+                profile.profiler.enable()
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            if profile.profiler is not None:
+                profile.profiler.disable()
+                _cprofile_lock.release()
+            _current_profile.reset(token)
+            wall = time.perf_counter() - profile.wall_start
+            cpu = time.thread_time() - profile.cpu_start
+            # Formatting stats and writing files is blocking; keep it off the loop
+            await run_in_threadpool(_store, profile, wall, cpu)
@@ -0,0 +1,401 @@
+"""Persistent BM25 index over stored resumes for top-k candidate search."""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent writers from several processes are unsafe
+    fcntl = None
+
+TALENT_POOL_DIR = os.getenv("TALENT_POOL_DIR", "talent_pool_index")
+# Number of logged adds/removes replayed on load before the index is compacted
+TALENT_POOL_FLUSH_EVERY = int(os.getenv("TALENT_POOL_FLUSH_EVERY", "1000"))
+LOG_NAME = "changes.log"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = set(
+    "a an and are as at be by for from in is it of on or our that the to we "
+    "will with you your".split()
+)
+
+
+def tokenize(text: str) -> list:
+    """Lowercase and split text into index terms, dropping stopwords."""
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS
+    ]
+
+
+class TalentPoolIndex:
+    """
+    Inverted BM25 index of resumes with incremental add/remove.
+
+    The compacted index is stored term-major as three NumPy arrays
+    (``indptr``, ``doc_ids``, ``tfs``) and reloaded with ``mmap_mode="r"``,
+    so reopening a large pool does not read the postings into memory.
+    Every add and remove is appended to ``changes.log`` before it is
+    applied and the log is replayed on load, so changes survive a restart
+    without a flush. Documents added since the last compaction live in an
+    in-memory delta searched alongside the memory-mapped postings; removals
+    are tombstones until a flush compacts them away.
+
+    Several worker processes can share one directory. Writers hold an
+    exclusive file lock and readers a shared one, and each process replays
+    log entries written by the others before reading or writing. A flush
+    writes its arrays under the next generation number and then switches
+    ``meta.json`` to it, so arrays another process has memory-mapped are
+    never overwritten.
+    """
+
+    def __init__(self, directory: str = TALENT_POOL_DIR):
+        self.directory = directory
+        self.lock = threading.RLock()
+        os.makedirs(os.path.join(self.directory, "resumes"), exist_ok=True)
+        with self.lock, self._file_lock(exclusive=True):
+            if not os.path.exists(self._path(LOG_NAME)):
+                self._write_log_header(self._read_generation())
+            self._load()
+
+    # Persistence
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _array_path(self, name: str, generation: int) -> str:
+        return self._path(f"{name}.{generation}.npy")
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool = False):
+        if fcntl is None:
+            yield
+            return
+        with open(self._path("lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_generation(self) -> int:
+        meta_path = self._path("meta.json")
+        if not os.path.exists(meta_path):
+            return 0
+        with open(meta_path, "r") as f:
+            return json.load(f)["generation"]
+
+    def _write_log_header(self, generation: int):
+        header = json.dumps({"generation": generation}).encode() + b"\n"
+        tmp_log = self._path(LOG_NAME + ".tmp")
+        with open(tmp_log, "wb") as f:
+            f.write(header)
+        os.replace(tmp_log, self._path(LOG_NAME))
+        self.log_stale = False
+        self.log_offset = len(header)
+
+    def load(self):
+        """Reload the compacted index from disk and replay the change log."""
+        with self.lock, self._file_lock():
+            self._load()
+
+    def _load(self):
+        self.generation = 0
+        self.vocab = {}
+        self.candidates = []  # per-document metadata, indexed by doc number
+        self.doc_index = {}  # candidate_id -> doc number
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.tfs = np.zeros(0, dtype=np.float32)
+        meta_path = self._path("meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            self.generation = meta["generation"]
+            self.vocab = meta["vocab"]
+            self.candidates = meta["candidates"]
+            self.doc_index = {
+                c["candidate_id"]: i for i, c in enumerate(self.candidates)
+            }
+            g = self.generation
+            self.indptr = np.load(self._array_path("indptr", g), mmap_mode="r")
+            self.doc_ids = np.load(self._array_path("doc_ids", g), mmap_mode="r")
+            self.tfs = np.load(self._array_path("tfs", g), mmap_mode="r")
+            self.doc_len = np.array(
+                np.load(self._array_path("doc_len", g), mmap_mode="r"),
+                dtype=np.float32,
+            )
+        self.alive = np.ones(len(self.candidates), dtype=bool)
+        self.delta = defaultdict(list)  # term id -> [(doc number, tf), ...]
+        self.pending_changes = 0
+        self.log_offset = 0
+        self.log_stale = False
+        self._sync()
+
+    def _sync(self):
+        """Apply change log entries written since this process last read the log."""
+        log_path = self._path(LOG_NAME)
+        if not os.path.exists(log_path):
+            return
+        with open(log_path, "rb") as f:
+            header = f.readline()
+            if json.loads(header)["generation"] != self.generation:
+                if self._read_generation() != self.generation:
+                    # Another process compacted the index
+                    self._load()
+                else:
+                    # A flush crashed between swapping meta.json and the log;
+                    # the old log's entries are already in the arrays
+                    self.log_stale = True
+                return
+            f.seek(max(self.log_offset, len(header)))
+            while True:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # end of log, or a partial write from a crashed process
+                self._apply(json.loads(line))
+                self.log_offset = f.tell()
+            self.log_offset = max(self.log_offset, len(header))
+
+    def _append(self, record: dict):
+        """Write a change to the log, then apply it. Requires the exclusive lock."""
+        if self.log_stale:
+            self._write_log_header(self.generation)
+        with open(self._path(LOG_NAME), "r+b") as f:
+            # Drop anything past the last complete entry before appending
+            f.truncate(self.log_offset)
+            f.seek(self.log_offset)
+            f.write(json.dumps(record).encode() + b"\n")
+            self.log_offset = f.tell()
+        self._apply(record)
+
+    def _apply(self, record: dict):
+        candidate_id = record["candidate_id"]
+        if candidate_id in self.doc_index:
+            doc = self.doc_index.pop(candidate_id)
+            self.alive[doc] = False
+        if record["op"] == "add":
+            doc = len(self.candidates)
+            for term, tf in record["terms"].items():
+                term_id = self.vocab.setdefault(term, len(self.vocab))
+                self.delta[term_id].append((doc, float(tf)))
+            self.candidates.append({"candidate_id": candidate_id, **record["metadata"]})
+            self.doc_index[candidate_id] = doc
+            self.doc_len = np.append(
+                self.doc_len, np.float32(sum(record["terms"].values()))
+            )
+            self.alive = np.append(self.alive, True)
+        self.pending_changes += 1
+
+    def flush(self):
+        """Compact the change log into new on-disk arrays and reload them."""
+        with self.lock, self._file_lock(exclusive=True):
+            self._sync()
+            self._compact()
+
+    def _compact(self):
+        n_terms = len(self.vocab)
+        base_terms = len(self.indptr) - 1
+        base_counts = np.diff(np.asarray(self.indptr))
+        base_term_of = np.repeat(np.arange(base_terms, dtype=np.int64), base_counts)
+
+        delta_terms, delta_docs, delta_tfs = [], [], []
+        for term_id, postings in self.delta.items():
+            for doc, tf in postings:
+                delta_terms.append(term_id)
+                delta_docs.append(doc)
+                delta_tfs.append(tf)
+
+        term_of = np.concatenate(
+            [base_term_of, np.asarray(delta_terms, dtype=np.int64)]
+        )
+        docs = np.concatenate(
+            [np.asarray(self.doc_ids), np.asarray(delta_docs, dtype=np.int32)]
+        )
+        tfs = np.concatenate(
+            [np.asarray(self.tfs), np.asarray(delta_tfs, dtype=np.float32)]
+        )
+
+        # Drop removed documents and renumber the survivors densely
+        keep = self.alive[docs]
+        remap = np.cumsum(self.alive, dtype=np.int64) - 1
+        term_of, docs, tfs = term_of[keep], remap[docs[keep]], tfs[keep]
+        order = np.lexsort((docs, term_of))
+        term_of, docs, tfs = term_of[order], docs[order], tfs[order]
+        indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_of, minlength=n_terms), out=indptr[1:])
+
+        candidates = [c for c, a in zip(self.candidates, self.alive) if a]
+        doc_len = self.doc_len[self.alive]
+
+        # New arrays go to new files; swapping meta.json commits them, and
+        # the log is reset only after that so a crash never loses changes
+        generation = self.generation + 1
+        arrays = {
+            "indptr": indptr,
+            "doc_ids": docs.astype(np.int32),
+            "tfs": tfs.astype(np.float32),
+            "doc_len": doc_len.astype(np.float32),
+        }
+        for name, array in arrays.items():
+            with open(self._array_path(name, generation), "wb") as f:
+                np.save(f, array)
+        tmp_meta = self._path("meta.json.tmp")
+        with open(tmp_meta, "w") as f:
+            json.dump(
+                {
+                    "generation": generation,
+                    "vocab": self.vocab,
+                    "candidates": candidates,
+                },
+                f,
+            )
+        os.replace(tmp_meta, self._path("meta.json"))
+        self._write_log_header(generation)
+
+        # Older generations stay readable through existing memory maps on
+        # POSIX; on Windows they are removed by a later flush once unmapped
+        current = f".{generation}.npy"
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy") and not name.endswith(current):
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+        self._load()
+
+    # Mutation
+
+    def add(self, text: str, candidate_id=None, metadata=None) -> str:
+        """Index a resume's text; re-adding an existing id replaces it."""
+        candidate_id = candidate_id or uuid.uuid4().hex
+        counts = Counter(tokenize(text))
+        with self.lock, self._file_lock(exclusive=True):
+            self._sync()
+            # Store the text before logging, so a replayed add always has it
+            with open(self._resume_path(candidate_id), "w") as f:
+                f.write(text)
+            self._append(
+                {
+                    "op": "add",
+                    "candidate_id": candidate_id,
+                    "metadata": metadata or {},
+                    "terms": dict(counts),
+                }
+            )
+            if self.pending_changes >= TALENT_POOL_FLUSH_EVERY:
+                self._compact()
+        return candidate_id
+
+    def remove(self, candidate_id: str) -> bool:
+        """Remove a resume from the pool. Returns False if it is unknown."""
+        with self.lock, self._file_lock(exclusive=True):
+            self._sync()
+            if candidate_id not in self.doc_index:
+                return False
+            self._append({"op": "remove", "candidate_id": candidate_id})
+            path = self._resume_path(candidate_id)
+            if os.path.exists(path):
+                os.remove(path)
+            if self.pending_changes >= TALENT_POOL_FLUSH_EVERY:
+                self._compact()
+            return True
+
+    # Queries
+
+    def _resume_path(self, candidate_id: str) -> str:
+        # Hash the id so distinct ids never share a file, whatever they contain
+        digest = hashlib.sha256(candidate_id.encode()).hexdigest()
+        return os.path.join(self.directory, "resumes", f"{digest}.txt")
+
+    def get_text(self, candidate_id: str):
+        path = self._resume_path(candidate_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return f.read()
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def search(self, query: str, top_k: int = 10) -> list:
+        """Return the ``top_k`` live candidates ranked by BM25 against ``query``."""
+        with self.lock, self._file_lock():
+            self._sync()
+            n_docs = len(self.candidates)
+            n_live = int(self.alive.sum())
+            if n_live == 0:
+                return []
+            term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+            if not term_ids:
+                return []
+
+            avg_len = float(self.doc_len[self.alive].mean()) or 1.0
+            base_terms = len(self.indptr) - 1
+            docs_parts, tfs_parts, idf_parts = [], [], []
+            for term_id in term_ids:
+                if term_id < base_terms:
+                    start, end = self.indptr[term_id], self.indptr[term_id + 1]
+                    docs = np.asarray(self.doc_ids[start:end])
+                    tfs = np.asarray(self.tfs[start:end])
+                else:
+                    docs = np.zeros(0, dtype=np.int32)
+                    tfs = np.zeros(0, dtype=np.float32)
+                if self.delta.get(term_id):
+                    extra = np.asarray(self.delta[term_id], dtype=np.float64)
+                    docs = np.concatenate([docs, extra[:, 0].astype(np.int32)])
+                    tfs = np.concatenate([tfs, extra[:, 1].astype(np.float32)])
+                live = self.alive[docs]
+                docs, tfs = docs[live], tfs[live]
+                if len(docs) == 0:
+                    continue
+                df = len(docs)
+                idf = math.log(1.0 + (n_live - df + 0.5) / (df + 0.5))
+                docs_parts.append(docs)
+                tfs_parts.append(tfs)
+                idf_parts.append(np.full(len(docs), idf, dtype=np.float32))
+            if not docs_parts:
+                return []
+
+            docs = np.concatenate(docs_parts)
+            tfs = np.concatenate(tfs_parts)
+            idf = np.concatenate(idf_parts)
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.doc_len[docs] / avg_len)
+            contrib = idf * tfs * (BM25_K1 + 1.0) / (tfs + norm)
+            scores = np.bincount(docs, weights=contrib, minlength=n_docs)
+
+            matched = np.flatnonzero(scores > 0)
+            k = min(top_k, len(matched))
+            if k == 0:
+                return []
+            top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {**self.candidates[doc], "bm25_score": round(float(scores[doc]), 4)}
+                for doc in top
+            ]
+
+
+_talent_pool = None
+_talent_pool_lock = threading.Lock()
+
+
+def get_talent_pool() -> TalentPoolIndex:
+    """Return the process-wide index, opening it on first use."""
+    global _talent_pool
+    with _talent_pool_lock:
+        if _talent_pool is None:
+            _talent_pool = TalentPoolIndex()
+        return _talent_pool
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+import app.routers.api.v1.matching as matching
+from app.main import app
+from app.services.admission import ADMISSION_WORKER_BUDGET, estimate_cost
+
+ANALYSIS = {
+    "overall_score": 80,
+    "technical_skills_score": 85,
+    "experience_score": 75,
+    "education_score": 70,
+    "cultural_fit_score": 80,
+    "domain_expertise_score": 65,
+    "critical_gaps": "None",
+    "hiring_recommendation": "Interview",
+    "detailed_analysis": "Strong match",
+}
+
+
+def slow_gemini(prompt, generation_config=None, model=None):
+    time.sleep(0.5)
+    return {
+        "candidates": [
+            {
+                "content": {"parts": [{"text": json.dumps(ANALYSIS)}]},
+                "finishReason": "STOP",
+            }
+        ]
+    }
+
+
+async def burst(n_requests: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def score(i):
+            return await client.post(
+                "/api/v1/matching/score-text",
+                data={
+                    "resume_text": "Python engineer with Django and AWS",
+                    # Distinct job descriptions, so no request is a cache hit
+                    "job_description": f"Backend role number {i}",
+                    "user_type": "HR",
+                },
+            )
+
+        async def health():
+            await asyncio.sleep(0.1)
+            start = time.perf_counter()
+            await client.get("/health")
+            return time.perf_counter() - start
+
+        *responses, health_seconds = await asyncio.gather(
+            *(score(i) for i in range(n_requests)), health()
+        )
+    return responses, health_seconds
+
+
+def test_concurrent_requests_past_worker_budget_are_shed(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(matching, "request_gemini", slow_gemini)
+    cost = estimate_cost("/api/v1/matching/score-text", 0, "HR")
+    n_requests = int(ADMISSION_WORKER_BUDGET // cost) * 3
+
+    responses, health_seconds = asyncio.run(burst(n_requests))
+
+    statuses = [response.status_code for response in responses]
+    assert 200 in statuses
+    assert 503 in statuses
+    for response in responses:
+        if response.status_code == 503:
+            assert int(response.headers["retry-after"]) >= 1
+    # Scoring runs in the thread pool, so the event loop stays responsive
+    assert health_seconds < 0.4
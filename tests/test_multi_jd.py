@@ -0,0 +1,76 @@
+import json
+
+import app.routers.api.v1.matching as matching
+
+ANALYSIS = {
+    "overall_score": 80,
+    "technical_skills_score": 85,
+    "experience_score": 75,
+    "education_score": 70,
+    "cultural_fit_score": 80,
+    "domain_expertise_score": 65,
+    "critical_gaps": "None",
+    "hiring_recommendation": "Interview",
+    "detailed_analysis": "Strong match",
+}
+JDS = {f"jd_{i}": f"Job description {i}" for i in range(1, 11)}
+
+
+def fake_gemini(monkeypatch, respond):
+    calls = []
+
+    def request_gemini(prompt, generation_config=None, model=None):
+        calls.append(generation_config)
+        return respond(generation_config)
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(matching, "request_gemini", request_gemini)
+    return calls
+
+
+def payload(text, finish_reason="STOP"):
+    return {
+        "candidates": [
+            {"content": {"parts": [{"text": text}]}, "finishReason": finish_reason}
+        ]
+    }
+
+
+def test_blocked_pack_is_not_split(monkeypatch):
+    calls = fake_gemini(
+        monkeypatch, lambda config: {"promptFeedback": {"blockReason": "SAFETY"}}
+    )
+    results, llm_calls = matching.score_job_pack(JDS, "Python engineer", "HR")
+    assert llm_calls == len(calls) == 1
+    assert set(results) == set(JDS)
+    assert all("SAFETY" in result["suggestions"] for result in results.values())
+
+
+def test_complete_pack_uses_one_call(monkeypatch):
+    calls = fake_gemini(
+        monkeypatch,
+        lambda config: payload(
+            json.dumps(
+                {job_id: ANALYSIS for job_id in config["responseSchema"]["required"]}
+            )
+        ),
+    )
+    results, llm_calls = matching.score_job_pack(JDS, "Python engineer", "HR")
+    assert llm_calls == len(calls) == 1
+    assert all(result["overall_score"] == 80 for result in results.values())
+
+
+def test_missing_results_are_retried_in_smaller_packs(monkeypatch):
+    def respond(config):
+        job_ids = config["responseSchema"].get("required", [])
+        if "jd_1" not in job_ids:
+            return payload(json.dumps(ANALYSIS))
+        # Drop jd_2 from the first pack
+        return payload(
+            json.dumps({job_id: ANALYSIS for job_id in job_ids if job_id != "jd_2"})
+        )
+
+    calls = fake_gemini(monkeypatch, respond)
+    results, llm_calls = matching.score_job_pack(JDS, "Python engineer", "HR")
+    assert llm_calls == len(calls) == 2
+    assert results["jd_2"]["overall_score"] == 80
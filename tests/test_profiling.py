@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+
+import app.services.profiling as profiling
+from app.main import app
+
+
+def test_non_ascii_admin_token_is_rejected(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_ADMIN_TOKEN", "secret")
+    client = TestClient(app)
+    headers = {"X-Profile": "1", "X-Admin-Token": "é".encode("latin-1")}
+
+    response = client.get("/health", headers=headers)
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+    response = client.get("/api/v1/admin/profiles", headers=headers)
+    assert response.status_code == 403
+
+
+def test_matching_admin_token_is_accepted(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_ADMIN_TOKEN", "secret")
+    assert profiling.is_admin_token("secret")
+    assert not profiling.is_admin_token("é")
+    assert not profiling.is_admin_token(None)
@@ -0,0 +1,67 @@
+from app.routers.api.v1.matching import repair_json
+
+
+def test_skips_prose_before_object():
+    assert repair_json('Here is the analysis: {"overall_score": 85}') == {
+        "overall_score": 85
+    }
+
+
+def test_returns_none_without_an_object():
+    assert repair_json("I could not analyse this resume.") is None
+
+
+def test_does_not_close_a_cut_off_number():
+    assert repair_json('{"overall_score": 8') is None
+    assert repair_json('{"red_flags": "none", "overall_score": 8') == {
+        "red_flags": "none"
+    }
+    assert repair_json('{"red_flags": "none", "overall_score": 8.') == {
+        "red_flags": "none"
+    }
+
+
+def test_keeps_a_number_followed_by_whitespace():
+    assert repair_json('{"a": "x", "overall_score": 85 ') == {
+        "a": "x",
+        "overall_score": 85,
+    }
+
+
+def test_drops_a_cut_off_string_value():
+    assert repair_json('{"overall_score": 85, "detailed_analysis": "Strong') == {
+        "overall_score": 85
+    }
+
+
+def test_drops_a_cut_off_key():
+    assert repair_json('{"overall_score": 85, "detailed_ana') == {"overall_score": 85}
+
+
+def test_keeps_a_complete_trailing_literal():
+    assert repair_json('{"overall_score": 85, "remote": true') == {
+        "overall_score": 85,
+        "remote": True,
+    }
+
+
+def test_handles_escaped_quotes_and_braces_in_strings():
+    text = '{"a": "say \\"hi\\" {not json}", "b": "cut'
+    assert repair_json(text) == {"a": 'say "hi" {not json}'}
+
+
+def test_closes_nested_objects_and_arrays():
+    text = (
+        '{"jd_1": {"overall_score": 80, "gaps": ["sql", "aws"]}, '
+        '"jd_2": {"overall_score": 70, "gaps": ["go", "k8'
+    )
+    assert repair_json(text) == {
+        "jd_1": {"overall_score": 80, "gaps": ["sql", "aws"]},
+        "jd_2": {"overall_score": 70, "gaps": ["go"]},
+    }
+
+
+def test_ignores_trailing_text_after_a_complete_object():
+    assert repair_json('{"overall_score": 85} Let me know if you need more.') == {
+        "overall_score": 85
+    }
@@ -0,0 +1,37 @@
+from app.routers.api.v1.matching import validate_response
+
+
+def test_scalar_text_fields_are_stringified():
+    result = validate_response(
+        {
+            "overall_score": 72,
+            "critical_gaps": ["Kubernetes", "Go"],
+            "red_flags": 3,
+            "hiring_recommendation": True,
+            "detailed_analysis": "Solid backend experience",
+        },
+        "HR",
+    )
+    assert result["overall_score"] == 72
+    assert result["critical_gaps"] == "Kubernetes\nGo"
+    assert result["red_flags"] == "3"
+    assert result["hiring_recommendation"] == "True"
+
+
+def test_out_of_range_scores_are_dropped():
+    result = validate_response(
+        {
+            "overall_score": 72,
+            "technical_skills_score": 140,
+            "skill_development_roadmap": "Learn Go",
+            "detailed_improvement_plan": "Add metrics",
+        },
+        "candidate",
+    )
+    assert result["technical_skills_score"] is None
+
+
+def test_missing_required_keys_are_reported():
+    result = validate_response({"overall_score": 72}, "HR")
+    assert result["score"] == 72
+    assert "Missing" in result["suggestions"]
@@ -0,0 +1,62 @@
+from app.services.talent_pool import TalentPoolIndex
+
+RESUMES = {
+    "alice": "Senior Python engineer with Django, PostgreSQL and AWS experience",
+    "bob": "Java developer building Spring microservices on Kubernetes",
+    "carol": "Data scientist using Python, pandas and machine learning models",
+}
+
+
+def ids(results):
+    return [result["candidate_id"] for result in results]
+
+
+def test_add_remove_flush_reload_search(tmp_path):
+    pool = TalentPoolIndex(str(tmp_path))
+    for candidate_id, text in RESUMES.items():
+        pool.add(text, candidate_id=candidate_id)
+    assert pool.remove("alice")
+    pool.flush()
+    pool.add("Python backend engineer, FastAPI and Redis", candidate_id="dave")
+
+    reloaded = TalentPoolIndex(str(tmp_path))
+    assert len(reloaded) == 3
+    assert set(ids(reloaded.search("python engineer"))) == {"carol", "dave"}
+    assert ids(reloaded.search("kubernetes")) == ["bob"]
+    assert reloaded.get_text("alice") is None
+    assert reloaded.get_text("dave").startswith("Python backend")
+
+    reloaded.flush()
+    assert ids(TalentPoolIndex(str(tmp_path)).search("redis")) == ["dave"]
+
+
+def test_unflushed_changes_survive_restart(tmp_path):
+    pool = TalentPoolIndex(str(tmp_path))
+    for candidate_id, text in RESUMES.items():
+        pool.add(text, candidate_id=candidate_id)
+    pool.remove("carol")
+
+    reloaded = TalentPoolIndex(str(tmp_path))
+    assert len(reloaded) == 2
+    assert set(ids(reloaded.search("python java"))) == {"alice", "bob"}
+
+
+def test_instances_see_each_others_changes(tmp_path):
+    first = TalentPoolIndex(str(tmp_path))
+    second = TalentPoolIndex(str(tmp_path))
+    first.add(RESUMES["alice"], candidate_id="alice")
+    assert ids(second.search("django")) == ["alice"]
+
+    second.add(RESUMES["bob"], candidate_id="bob")
+    second.flush()
+    first.add(RESUMES["carol"], candidate_id="carol")
+    assert ids(second.search("pandas")) == ["carol"]
+    assert set(ids(first.search("python java"))) == {"alice", "bob", "carol"}
+
+
+def test_similar_ids_do_not_share_resume_text(tmp_path):
+    pool = TalentPoolIndex(str(tmp_path))
+    pool.add(RESUMES["alice"], candidate_id="a/b")
+    pool.add(RESUMES["bob"], candidate_id="a_b")
+    pool.remove("a/b")
+    assert pool.get_text("a_b") == RESUMES["bob"]
@@ -0,0 +1,38 @@
+import io
+import zipfile
+
+from app.routers.api.v1.matching import (
+    ZIP_MAX_ARCHIVE_ENTRIES,
+    check_zip_directory,
+    iter_zip_results,
+)
+
+
+def build_zip(names):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name in names:
+            archive.writestr(name, b"")
+    buffer.seek(0)
+    return buffer
+
+
+def test_small_archive_passes():
+    assert check_zip_directory(build_zip(["a.pdf", "b.docx"])) is None
+
+
+def test_not_a_zip_is_rejected():
+    assert "not a valid ZIP" in check_zip_directory(io.BytesIO(b"plain text"))
+
+
+def test_skipped_entries_count_toward_the_entry_limit():
+    names = [f"__MACOSX/._{i}.pdf" for i in range(ZIP_MAX_ARCHIVE_ENTRIES + 1)]
+    assert "entries" in check_zip_directory(build_zip(names))
+
+
+def test_results_stream_reports_skipped_entries():
+    archive = build_zip(["resumes/", "__MACOSX/._a.pdf", ".DS_Store", "notes.txt"])
+    lines = list(iter_zip_results(archive, "Python role", "HR", "full", [], True))
+    assert lines[-1].endswith(b"\n")
+    assert b'"skipped":1' in lines[-1]
+    assert b'"failed":1' in lines[-1]